@@ -1,86 +1,195 @@
+import time
+import_start = time.perf_counter()
+
 from dotenv import load_dotenv
 import os
-from flask import Flask, request, jsonify
-import numpy as np
-import instaloader
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 import pickle
 from flask_cors import CORS  # Import CORS
-import pandas as pd  # Import pandas for DataFrame
-import cv2  # Import OpenCV for image comparison
-import requests  # For fetching images from URLs
-import tempfile  # For temporary file handling
 import requests
 import json
+import importlib.util
 from datetime import datetime
-from bs4 import BeautifulSoup
-import gugl
-import foto
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import aiohttp
+import async_engine
+import cache
+import components
+import debug_capture
+import features
+import http_client
+import jobs
+import metrics
+import ratelimit
+import session_pool
+import singleflight
+import twitter_rules
+
+# Heavy modules are imported through components: at startup, or on first use with LAZY_INIT
+instaloader = components.lazy_import('instaloader')
+bs4 = components.lazy_import('bs4')
+phash = components.lazy_import('phash', 'opencv')  # OpenCV for image comparison
+gugl = components.lazy_import('gugl', 'google_search')
+foto = components.lazy_import('foto', 'reverse_image_search')
+
+# Use the much faster lxml tree builder for BeautifulSoup when it is installed
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
 
 load_dotenv()
 app = Flask(__name__)
 USERNAME = os.getenv('USERNAME')
 PASSWD = os.getenv('PASSWD')
 
+# Defer loading the model, the Instagram session etc. until a route needs them
+LAZY_INIT = os.getenv('LAZY_INIT', '0').lower() in ('1', 'true', 'yes')
+
 CORS(app)  # Enable CORS for all routes
 
-# Load the model and scaler
-with open('./model/model.pkl', 'rb') as f:
-    model = pickle.load(f)
-with open('./model/scaler.pkl', 'rb') as f:
-    scaler = pickle.load(f)
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_duration(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, route=route,
+                                        method=request.method, status=response.status_code)
+    return response
+
+# 'pickle' (CatBoost model + sklearn scaler) or 'cbm' (native export with the
+# scaler folded in, see export_model.py)
+MODEL_FORMAT = os.getenv('MODEL_FORMAT', 'pickle')
+
+def load_model():
+    """Loads the model and scaler. The scaler is None for the native format."""
+    if MODEL_FORMAT == 'cbm':
+        import export_model
+        return export_model.load_native_model(), None
+
+    with open('./model/model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open('./model/scaler.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    return model, scaler
+
+model_component = components.register('model', load_model)
 
-# Create the Instaloader instance once
-loader = instaloader.Instaloader()
 COOKIES_PATH = "cookies.txt"
 
-try:
-    if os.path.exists(COOKIES_PATH):
-        loader.load_session_from_file(USERNAME, COOKIES_PATH)  # Load session from file
-        print("Loaded session from cookies.")
-    else:
-        loader.login(USERNAME, PASSWD)  # Replace with your actual credentials
-        loader.save_session_to_file(COOKIES_PATH)  # Save session to file
-        print("Logged in and saved session to cookies.")
-except Exception as e:
-    print(f"Error during login or cookie handling: {e}")
+# Several Instagram accounts as "username:session file,...". Without it the
+# single USERNAME/PASSWD account with cookies.txt is used.
+INSTAGRAM_SESSIONS = os.getenv('INSTAGRAM_SESSIONS', '')
+
+def login_and_save(loader, username, path):
+    loader.login(username, PASSWD)  # Replace with your actual credentials
+    loader.save_session_to_file(path)  # Save session to file
+    print("Logged in and saved session to cookies.")
+
+def load_instagram_session():
+    """Creates the pool of Instaloader sessions from the saved session files."""
+    if INSTAGRAM_SESSIONS:
+        return session_pool.load_pool(session_pool.parse_session_files(INSTAGRAM_SESSIONS))
+    return session_pool.load_pool([(USERNAME, COOKIES_PATH)], login=login_and_save)
+
+instagram_session = components.register('instagram_session', load_instagram_session)
+
+# Limits for /predict_batch
+MAX_BATCH_SIZE = 100
+BATCH_FETCH_WORKERS = 8
+
+def fetch_batch_item(fetch, username, failed=None):
+    """
+    Runs fetch(username) for one item of a batch. An exception is logged
+    and returns `failed`, so one bad profile doesn't fail the whole batch.
+    """
+    try:
+        return fetch(username)
+    except Exception as e:
+        print(f"Error fetching {username!r} for a batch: {e}")
+        return failed
+
+# Stages of /profile_report run on this shared pool
+REPORT_WORKERS = 16
+report_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+
+# Perceptual hashes of the default Instagram profile pictures, computed once
+DEFAULT_PIC_FILES = ["igdefault.jpg", "ig2.jpg"]
+DEFAULT_PIC_MAX_DISTANCE = 10  # max differing bits (of 64) to count as a default picture
+PROFILE_PIC_TIMEOUT = 10  # seconds
+
+def load_default_pic_hashes():
+    """Decodes and hashes the default profile pictures."""
+    pic_hashes = [phash.hash_image_file(path) for path in DEFAULT_PIC_FILES]
+    if any(pic_hash is None for pic_hash in pic_hashes):
+        print("Warning: Default profile picture files are missing or corrupted.")
+    return [pic_hash for pic_hash in pic_hashes if pic_hash is not None]
+
+default_pics = components.register('default_pics', load_default_pic_hashes)
+
+# Local index of the custom profile pictures of every fetched account, to count
+# the other accounts using the same photo (see avatar_index.py).
+# An empty AVATAR_INDEX_PATH keeps the index in memory only.
+AVATAR_INDEX_PATH = os.getenv('AVATAR_INDEX_PATH', 'avatar_index.sqlite3')
+AVATAR_MATCH_DISTANCE = int(os.getenv('AVATAR_MATCH_DISTANCE', 6))  # max differing bits (of 64) to count as the same photo
+
+def load_avatar_index():
+    import avatar_index  # Imports OpenCV (through phash), so only when first needed
+    return avatar_index.AvatarIndex(AVATAR_INDEX_PATH or None)
 
-# Global variable to store the prediction result
-is_default_profile_pic = False
+avatars = components.register('avatar_index', load_avatar_index)
+
+def avatar_seen_on_accounts(username):
+    """
+    Number of other indexed accounts with the same profile picture, or None
+    if the account has no custom picture in the index. No network calls.
+    """
+    try:
+        accounts = avatars.get().other_accounts(username, AVATAR_MATCH_DISTANCE)
+    except Exception as e:
+        print(f"Error querying the avatar index: {e}")
+        return None
+    return len(accounts) if accounts is not None else None
 
 def has_custom_profile_pic(profile):
     """Checks if the profile has a custom profile picture."""
-    global is_default_profile_pic
     try:
-        # Load default profile pictures
-        default_pics = [cv2.imread("igdefault.jpg"), cv2.imread("ig2.jpg")]
-        if any(pic is None for pic in default_pics):
+        default_pic_hashes = default_pics.get()
+        if not default_pic_hashes:
             raise FileNotFoundError("Default profile picture files are missing or corrupted.")
 
         # Fetch the profile picture
-        response = requests.get(profile.profile_pic_url, stream=True)
+        with metrics.STAGE_SECONDS.time(stage='instagram.profile_pic_download'):
+            try:
+                response = http_client.get(profile.profile_pic_url, timeout=PROFILE_PIC_TIMEOUT)
+            except requests.exceptions.RequestException:
+                metrics.UPSTREAM_CALLS.inc(upstream='instagram_cdn', outcome='error')
+                raise
         if response.status_code != 200:
+            metrics.UPSTREAM_CALLS.inc(upstream='instagram_cdn', outcome='http_error')
             print(f"Failed to download profile picture. HTTP status: {response.status_code}")
             return True  # Assume custom picture on failure
-
-        # Save the profile picture temporarily
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_file:
-            for chunk in response.iter_content(1024):  # Stream content to avoid memory overflow
-                tmp_file.write(chunk)
-            tmp_file_path = tmp_file.name
-
-        # Load the saved profile picture
-        profile_pic = cv2.imread(tmp_file_path)
-        os.remove(tmp_file_path)  # Clean up the temporary file
-
-        if profile_pic is None:
-            print("Error: Failed to load profile picture with OpenCV.")
-            return True  # Assume custom picture on error
-
-        # Compare the profile picture with default pictures
-        is_default_profile_pic = any(
-            pic.shape == profile_pic.shape and not np.bitwise_xor(pic, profile_pic).any()
-            for pic in default_pics if pic is not None
-        )
+        metrics.UPSTREAM_CALLS.inc(upstream='instagram_cdn', outcome='ok')
+
+        # Decode and hash the profile picture in memory
+        with metrics.STAGE_SECONDS.time(stage='instagram.profile_pic_compare'):
+            profile_pic_hash = phash.hash_image_bytes(response.content)
+            if profile_pic_hash is None:
+                print("Error: Failed to decode profile picture with OpenCV.")
+                return True  # Assume custom picture on error
+
+            # Compare the profile picture with default pictures
+            is_default_profile_pic = any(
+                phash.hamming_distance(pic_hash, profile_pic_hash) <= DEFAULT_PIC_MAX_DISTANCE
+                for pic_hash in default_pic_hashes
+            )
+        if not is_default_profile_pic:
+            try:
+                avatars.get().add(profile.username, profile_pic_hash)
+            except Exception as e:
+                print(f"Error adding to the avatar index: {e}")
         return not is_default_profile_pic  # Return True if custom, False if default
 
     except Exception as e:
@@ -88,33 +197,51 @@ def has_custom_profile_pic(profile):
         return True  # Assume custom picture on failure
 
 
+# Profile/feature cache in front of instaloader
+PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', 10000))
+PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', 3600))  # seconds
+PROFILE_CACHE_STALE_TTL = int(os.getenv('PROFILE_CACHE_STALE_TTL', 0))  # 0 disables stale-while-revalidate
+
+profile_cache = cache.TTLCache(PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL, PROFILE_CACHE_STALE_TTL)
+
+# Cache shared by all worker processes on the host (see CACHE_BACKEND / CACHE_PATH),
+# with an expiry per data type
+shared_cache = cache.backend_from_env(ttls={
+    'instagram_profile': int(os.getenv('CACHE_TTL_INSTAGRAM', 3600)),
+    'twitter_profile': int(os.getenv('CACHE_TTL_TWITTER', 3600)),
+    'social_links': int(os.getenv('CACHE_TTL_SOCIAL_LINKS', 86400)),
+})
+# Social links where some platforms gave no definite answer are kept only this long (seconds)
+SOCIAL_LINKS_PARTIAL_TTL = int(os.getenv('CACHE_TTL_SOCIAL_LINKS_PARTIAL', 300))
+
+# Concurrent lookups of the same (platform, username) share one upstream fetch
+inflight = singleflight.Group()
+
 def extract_features_instaloader(username):
-    """Extracts features and profile information from an Instagram profile."""
+    """Extracts features and profile information from an Instagram profile, using the caches."""
+    key = username.lower()
+    def load():
+        return inflight.do(('instagram', key), lambda: shared_cache.get_or_load(
+            'instagram_profile', key, lambda: fetch_features_instaloader(username)))
+
+    result = profile_cache.get_or_load(key, load)
+    if result is None:
+        return None, None
+    feature_values, profile_info = result
+    return features.FeatureVector(feature_values), profile_info
+
+def fetch_features_instaloader(username):
+    """Fetches an Instagram profile and extracts its features. Returns None on failure."""
     try:
-        profile = instaloader.Profile.from_username(loader.context, username)
+        with instagram_session.get().checkout() as loader, \
+                metrics.STAGE_SECONDS.time(stage='instagram.fetch_profile'):
+            profile = instaloader.Profile.from_username(loader.context, username)
+        metrics.UPSTREAM_CALLS.inc(upstream='instagram', outcome='ok')
 
         # Extract feature vector
         profile_pic = 1 if has_custom_profile_pic(profile) else 0
-        nums_length_username = sum(c.isdigit() for c in profile.username) / len(profile.username)
-        fullname_words = len(profile.full_name.split())
-        nums_length_fullname = sum(c.isdigit() for c in profile.full_name) / max(len(profile.full_name), 1)
-        name_equals_username = 1 if profile.full_name.replace(" ", "").lower() == profile.username.lower() else 0
-        description_length = len(profile.biography)
-        external_url = 1 if profile.external_url else 0
-        private = 1 if profile.is_private else 0
-        num_posts = profile.mediacount
-        num_followers = profile.followers
-        num_follows = profile.followees
-
-        activity_ratio = np.round(num_posts / num_followers, 2) if num_followers else 0
-        followers_gt_follows = 1 if num_followers > num_follows else 0
-
-        features = [
-            profile_pic, nums_length_username, fullname_words,
-            nums_length_fullname, name_equals_username, description_length,
-            external_url, private, num_posts, num_followers,
-            num_follows, activity_ratio, followers_gt_follows
-        ]
+        with metrics.STAGE_SECONDS.time(stage='instagram.features'):
+            feature_vector = features.FeatureVector.from_profile(profile, profile_pic)
 
         profile_info = {
             "username": profile.username,
@@ -128,14 +255,103 @@ def extract_features_instaloader(username):
             "external_url": profile.external_url,
         }
 
-        return features, profile_info
+        # Plain list so the result can be cached as JSON
+        return feature_vector.to_list(), profile_info
 
     except instaloader.exceptions.ProfileNotExistsException:
+        metrics.UPSTREAM_CALLS.inc(upstream='instagram', outcome='not_found')
         print("Error: Profile does not exist.")
-        return None, None
+        return None
     except Exception as e:
+        metrics.UPSTREAM_CALLS.inc(upstream='instagram', outcome='error')
         print(f"Error: {e}")
-        return None, None
+        return None
+
+def score_features(feature_rows):
+    """
+    Scales and scores a list of FeatureVectors in one model call.
+    Returns a list of (fake_probability, is_fake) tuples.
+    """
+    model, scaler = model_component.get()
+
+    # CatBoost's predict() for a binary classifier is predict_proba > 0.5,
+    # so one predict_proba call gives us both values
+    with metrics.STAGE_SECONDS.time(stage='model.scale'):
+        input_data = features.stack(feature_rows)
+        if scaler is not None:
+            # Same arithmetic as scaler.transform(), without building a DataFrame.
+            # The native model has the scaler folded in and takes raw features.
+            input_data = (input_data - scaler.mean_) / scaler.scale_
+    with metrics.STAGE_SECONDS.time(stage='model.predict'):
+        fake_probabilities = model.predict_proba(input_data)[:, 1]
+    return [(float(p), bool(p > 0.5)) for p in fake_probabilities]
+
+# Errors for a missing request field, shared with the routes of asgi.py
+MISSING_FIELD_ERRORS = {
+    'username': 'Username is required',
+    'image_url': 'Image URL is required',
+    'query': 'Query is required',
+}
+
+STREAM_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+def requested_stream_mode():
+    """
+    Returns 'ndjson' or 'sse' if the client asked for a streaming response
+    (?stream=ndjson|sse or a matching Accept header), else None.
+    """
+    mode = request.args.get('stream')
+    if mode in STREAM_MIMETYPES:
+        return mode
+    for mode, mimetype in STREAM_MIMETYPES.items():
+        if request.accept_mimetypes.best == mimetype:
+            return mode
+    return None
+
+def stream_events(events, mode):
+    """
+    Streams an iterable of event dicts as newline-delimited JSON or
+    Server-Sent Events. Every stream ends with a "done" or "error" event.
+    """
+    def generate():
+        def encode(event):
+            if mode == 'sse':
+                return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            return json.dumps(event) + "\n"
+
+        try:
+            for event in events:
+                yield encode(event)
+            yield encode({'event': 'done'})
+        except Exception as e:
+            print(f"Error while streaming: {e}")
+            yield encode({'event': 'error', 'error': str(e)})
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}  # Don't let proxies buffer the stream
+    return Response(stream_with_context(generate()), mimetype=STREAM_MIMETYPES[mode], headers=headers)
+
+def predict_instagram(username):
+    """
+    Fetches an Instagram profile and scores it with the model.
+    Returns None if the profile could not be fetched.
+    """
+    # Extract features using instaloader
+    feature_vector, profile_info = extract_features_instaloader(username)
+    if profile_info is None:
+        return None
+
+    # Predict using the model
+    fake_probability, is_fake = score_features([feature_vector])[0]
+
+    return {
+        'fake_probability': fake_probability,
+        'is_fake': is_fake,
+        'avatar_seen_on_accounts': avatar_seen_on_accounts(username),
+        'profile_info': profile_info
+    }
 
 @app.route('/predict', methods=['POST'])
 def predict():
@@ -145,31 +361,12 @@ def predict():
         username = data.get('username')
 
         if not username:
-            return jsonify({'error': 'Username is required'}), 400
+            return jsonify({'error': MISSING_FIELD_ERRORS['username']}), 400
 
-        # Extract features using instaloader
-        features, profile_info = extract_features_instaloader(username)
-        if profile_info is None:
+        response_data = predict_instagram(username)
+        if response_data is None:
             return jsonify({'error': 'Failed to fetch profile information'}), 500
 
-        # Prepare features for the model
-        feature_names = ['profile pic', 'nums/length username', 'fullname words',
-                         'nums/length fullname', 'name==username', 'description length',
-                         'external URL', 'private', '#posts', '#followers', '#follows',
-                         'activity ratio', '#followers > #follows?']
-        input_data = pd.DataFrame([features], columns=feature_names)
-        scaled_input_data = scaler.transform(input_data)
-
-        # Predict using the model
-        prediction = model.predict(scaled_input_data)
-        fake_probability = float(model.predict_proba(scaled_input_data)[:, 1])
-
-        response_data = {
-            'fake_probability': fake_probability,
-            'is_fake': bool(prediction[0]),
-            'profile_info': profile_info
-        }
-
         print("Sent data (without social links):", response_data)
         return jsonify(response_data)
 
@@ -177,6 +374,77 @@ def predict():
         print(f"Error during prediction: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """
+    Scores a list of Instagram usernames. Profiles are fetched concurrently
+    and the model runs once over the stacked feature matrix.
+    """
+    try:
+        data = request.get_json()
+        usernames = data.get('usernames')
+
+        if not usernames or not isinstance(usernames, list):
+            return jsonify({'error': 'A list of usernames is required'}), 400
+        if not all(isinstance(username, str) and username.strip() for username in usernames):
+            return jsonify({'error': 'Every username must be a non-empty string'}), 400
+        if len(usernames) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} usernames per batch'}), 400
+
+        # Fetch all profiles at the same time
+        with ThreadPoolExecutor(max_workers=min(BATCH_FETCH_WORKERS, len(usernames))) as executor:
+            extracted = list(executor.map(
+                lambda username: fetch_batch_item(extract_features_instaloader, username, (None, None)),
+                usernames))
+
+        # Stack the rows we could fetch and score them in one call
+        fetched = [(username, feature_vector, profile_info)
+                   for username, (feature_vector, profile_info) in zip(usernames, extracted)
+                   if profile_info is not None]
+        scores = score_features([feature_vector for _, feature_vector, _ in fetched]) if fetched else []
+        scored = {username: (score, profile_info)
+                  for (username, _, profile_info), score in zip(fetched, scores)}
+
+        results = []
+        for username in usernames:
+            if username not in scored:
+                results.append({'username': username, 'error': 'Failed to fetch profile information'})
+                continue
+            (fake_probability, is_fake), profile_info = scored[username]
+            results.append({
+                'username': username,
+                'fake_probability': fake_probability,
+                'is_fake': is_fake,
+                'avatar_seen_on_accounts': avatar_seen_on_accounts(username),
+                'profile_info': profile_info
+            })
+
+        return jsonify({'results': results})
+
+    except Exception as e:
+        print(f"Error during batch prediction: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    """
+    Hit/miss counters of the in-process caches, the state of the upstream
+    rate limiters and job counts by status.
+    """
+    response_data = {
+        'profile_cache': profile_cache.stats(),
+        'rate_limits': ratelimit.stats(),
+        'jobs': job_queue.stats(),
+    }
+    # Don't import the search modules just for their stats
+    if components.registry['google_search'].loaded:
+        response_data['search_cache'] = gugl.search_cache.stats()
+    if components.registry['reverse_image_search'].loaded:
+        response_data['reverse_search_cache'] = foto.search_cache.stats()
+    if avatars.loaded:
+        response_data['avatar_index'] = avatars.get().stats()
+    return jsonify(response_data)
+
 @app.route('/social_links', methods=['POST'])
 def get_social_links():
     try:
@@ -184,7 +452,11 @@ def get_social_links():
         username = data.get('username')
 
         if not username:
-            return jsonify({'error': 'Username is required'}), 400
+            return jsonify({'error': MISSING_FIELD_ERRORS['username']}), 400
+
+        stream_mode = requested_stream_mode()
+        if stream_mode:
+            return stream_events(iter_social_media_presence(username), stream_mode)
 
         social_links = check_social_media_presence(username)
         return jsonify({'social_links': social_links})
@@ -194,69 +466,196 @@ def get_social_links():
         return jsonify({'error': str(e)}), 500
 
 
+# Platforms checked by /social_links
+SOCIAL_PLATFORMS = {
+    "Facebook": "https://www.facebook.com/{}",
+    "Twitter": "https://x.com/{}",
+    "Instagram": "https://www.instagram.com/{}",
+    "Pinterest": "https://www.pinterest.com/{}",
+    "LinkedIn": "https://www.linkedin.com/in/{}",
+    "YouTube": "https://www.youtube.com/@{}", 
+    "Tumblr": "https://{}.tumblr.com/",
+    "Reddit": "https://www.reddit.com/user/{}",
+    "Medium": "https://medium.com/@{}",
+    "GitHub": "https://github.com/{}",
+    "GitLab": "https://gitlab.com/{}",
+    "Bitbucket": "https://bitbucket.org/{}/",
+    "Quora": "https://www.quora.com/profile/{}",
+    # "Discord": "https://discord.com/users/{}",  # Requires Discord User ID 
+}
+
+# Limits for the social media checks
+SOCIAL_PLATFORM_TIMEOUT = 8  # seconds per platform
+SOCIAL_MAX_CONCURRENCY = 8  # platforms checked at the same time per lookup
+NOT_FOUND_STATUSES = (404, 410)  # Any other status than these and 200 is no answer
+
+# check_platform() result for a platform that gave no definite answer
+# (timeout, connection error, unexpected status or rate limited)
+CHECK_FAILED = 'check_failed'
+
+
+def is_profile_found(platform, text):
+    """
+    Platform-specific checks for profile existence on a 200 response.
+    """
+    if platform == "Facebook":
+        return "This content isn't available at the moment" not in text
+    elif platform == "Twitter":
+        return "This account doesn’t exist" not in text
+    elif platform == "Instagram":
+        return "Follow" in text
+    elif platform == "Pinterest":
+        return "Here’s how it works." not in text
+    elif platform == "YouTube":
+        return "This page isn't available." not in text
+    elif platform == "Tumblr":
+        return "There's nothing here." not in text
+    elif platform == "Reddit":
+        # Reddit answers 200 for missing and suspended users too, so any 200 counts
+        return True
+    elif platform == "Medium":
+        return "Out of nothing, something." not in text
+    elif platform == "GitHub":
+        return "Find code, projects, and people on GitHub:" not in text
+    elif platform == "Bitbucket":
+        return "Resource not found" not in text
+    elif platform == "Quora":
+        return "Page Not Found" not in text
+    elif platform == "Twitch":
+        return "Sorry. Unless you've got a time machine, that content is unavailable." not in text
+    # ... Add checks for other platforms ...
+    return False
+
+
+async def check_platform(semaphore, platform, url):
+    """
+    Checks a single platform. Returns a link dict if the profile exists,
+    None if it doesn't, and CHECK_FAILED if the platform gave no answer.
+    """
+    session = await async_engine.get_session()
+    try:
+        await ratelimit.acquire_async(url, max_wait=SOCIAL_PLATFORM_TIMEOUT)
+    except ratelimit.RateLimited as e:
+        metrics.SOCIAL_CHECKS.inc(platform=platform, result='rate_limited')
+        print(f"Skipped {platform}: {e}")
+        return CHECK_FAILED
+
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            timeout = aiohttp.ClientTimeout(total=SOCIAL_PLATFORM_TIMEOUT)
+            async with session.get(url, timeout=timeout) as response:
+                ratelimit.report_status(url, response.status)
+                if response.status in NOT_FOUND_STATUSES:
+                    metrics.SOCIAL_CHECKS.inc(platform=platform, result='not_found')
+                    return None
+                if response.status != 200:
+                    metrics.SOCIAL_CHECKS.inc(platform=platform, result='http_error')
+                    return CHECK_FAILED
+                text = await response.text(errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.SOCIAL_CHECKS.inc(platform=platform, result='error')
+            print(f"Error checking {platform}: {e!r}")
+            return CHECK_FAILED
+        finally:
+            metrics.SOCIAL_CHECK_SECONDS.observe(time.perf_counter() - start, platform=platform)
+
+    if is_profile_found(platform, text):
+        metrics.SOCIAL_CHECKS.inc(platform=platform, result='found')
+        return {"platform": platform, "url": url}
+    metrics.SOCIAL_CHECKS.inc(platform=platform, result='not_found')
+    return None
+
+
+def platform_checks(username):
+    """
+    Builds the check coroutines for every platform, keyed by platform name.
+    """
+    semaphore = asyncio.Semaphore(SOCIAL_MAX_CONCURRENCY)
+    return {
+        platform: check_platform(semaphore, platform, url_template.format(username))
+        for platform, url_template in SOCIAL_PLATFORMS.items()
+    }
+
+
+async def check_social_media_presence_async(username):
+    """
+    Checks all platforms concurrently on the shared connection pool.
+    Returns the links found and the number of platforms that gave no answer.
+    """
+    results = await asyncio.gather(*platform_checks(username).values())
+    links = [link for link in results if link is not None and link != CHECK_FAILED]
+    return links, results.count(CHECK_FAILED)
+
+
+def cache_social_links(key, links, failed):
+    """
+    Caches the links of a lookup. A lookup where some platforms failed is
+    kept for SOCIAL_LINKS_PARTIAL_TTL only, and one where all failed not at
+    all, so an outage doesn't read as "no accounts" for a day.
+    """
+    if failed == 0:
+        shared_cache.set('social_links', key, links)
+    elif failed < len(SOCIAL_PLATFORMS):
+        shared_cache.set('social_links', key, links, ttl=SOCIAL_LINKS_PARTIAL_TTL)
+
+
+async def get_social_links_async(username):
+    """
+    Cached social links of a username. Runs on the async_engine loop; the
+    cache calls (SQLite, which may wait on other workers) run on threads.
+    """
+    key = username.lower()
+    links = await asyncio.to_thread(shared_cache.get, 'social_links', key)
+    if links is None:
+        links, failed = await check_social_media_presence_async(username)
+        await asyncio.to_thread(cache_social_links, key, links, failed)
+    return links
+
+
 def check_social_media_presence(username):
     """
     Checks if an account with the given username exists on various platforms.
     """
-    platforms = {
-        "Facebook": "https://www.facebook.com/{}",
-        "Twitter": "https://x.com/{}",
-        "Instagram": "https://www.instagram.com/{}",
-        "Pinterest": "https://www.pinterest.com/{}",
-        "LinkedIn": "https://www.linkedin.com/in/{}",
-        "YouTube": "https://www.youtube.com/@{}", 
-        "Tumblr": "https://{}.tumblr.com/",
-        "Reddit": "https://www.reddit.com/user/{}",
-        "Medium": "https://medium.com/@{}",
-        "GitHub": "https://github.com/{}",
-        "GitLab": "https://gitlab.com/{}",
-        "Bitbucket": "https://bitbucket.org/{}/",
-        "Quora": "https://www.quora.com/profile/{}",
-        # "Discord": "https://discord.com/users/{}",  # Requires Discord User ID 
-    }
+    return async_engine.run(get_social_links_async(username))
+
+
+def iter_social_media_presence(username):
+    """
+    Like check_social_media_presence(), but yields one event per platform
+    as soon as its check finishes.
+    """
+    key = username.lower()
+    cached = shared_cache.get('social_links', key)
+    if cached is not None:
+        for link in cached:
+            yield {'event': 'result', 'found': True, 'cached': True, **link}
+        return
+
     found_links = []
+    failed = 0
+    for platform, link in async_engine.iter_completed(platform_checks(username)):
+        if link == CHECK_FAILED:
+            failed += 1
+            yield {'event': 'result', 'found': None, 'platform': platform, 'error': 'No answer from platform'}
+        elif link is not None:
+            found_links.append(link)
+            yield {'event': 'result', 'found': True, **link}
+        else:
+            yield {'event': 'result', 'found': False, 'platform': platform}
 
-    for platform, url_template in platforms.items():
-        url = url_template.format(username)
-        try:
-            response = requests.get(url)
-            # Platform-specific checks for profile existence
-            if response.status_code == 200:
-                if platform == "Facebook" and "This content isn't available at the moment" not in response.text:
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "Twitter" and "This account doesn’t exist" not in response.text: 
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "Instagram" and "Follow" in response.text:
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "Pinterest" and "Here’s how it works." not in response.text:
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "YouTube" and "This page isn't available." not in response.text:
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "Tumblr" and "There's nothing here." not in response.text:
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "Reddit":
-                    if "This account has been suspended" not in response.text  and "Sorry, nobody on Reddit" not in response.text:
-                        found_links.append({"platform": platform, "url": url})
-                    else:
-                        found_links.append({"platform": platform, "url": url})
-                elif platform == "Medium" and "Out of nothing, something." not in response.text: 
-                    found_links.append({"platform": platform, "url": url}) 
-                elif platform == "GitHub" and "Find code, projects, and people on GitHub:" not in response.text:
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "Bitbucket" and "Resource not found" not in response.text:
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "Quora" and "Page Not Found" not in response.text:  
-                    found_links.append({"platform": platform, "url": url})
-                elif platform == "Twitch" and "Sorry. Unless you've got a time machine, that content is unavailable." not in response.text:
-                    found_links.append({"platform": platform, "url": url}) 
-                # ... Add checks for other platforms ...
-
-
-        except requests.exceptions.RequestException as e:
-            print(f"Error checking {platform}: {e}")
-            continue
-
-    return found_links
+    # Keep the cached list in platform order, like the non-streaming path
+    order = list(SOCIAL_PLATFORMS)
+    found_links.sort(key=lambda link: order.index(link['platform']))
+    cache_social_links(key, found_links, failed)
+
+def reverse_image_search(image_url):
+    """
+    foto.reverse_image_search() with timing. Results are cached by image
+    content in foto, which also counts the upstream calls.
+    """
+    with metrics.STAGE_SECONDS.time(stage='reverse_search'):
+        return foto.reverse_image_search(image_url)
 
 @app.route('/reverse_search', methods=['POST'])
 def reverse_search():
@@ -268,97 +667,188 @@ def reverse_search():
         image_url = data.get('image_url')
 
         if not image_url:
-            return jsonify({'error': 'Image URL is required'}), 400
+            return jsonify({'error': MISSING_FIELD_ERRORS['image_url']}), 400
+
+        stream_mode = requested_stream_mode()
+        if stream_mode:
+            def events():
+                yield {'event': 'started'}  # A single upstream call, so tell the client we're on it
+                yield {'event': 'result', 'results': reverse_image_search(image_url)}
+            return stream_events(events(), stream_mode)
 
-        results = foto.reverse_image_search(image_url)  # Call the function from foto.py
+        results = reverse_image_search(image_url)  # Call the function from foto.py
         return jsonify(results)  # Return the results as JSON
 
+    except TimeoutError as e:
+        print(f"Error during reverse image search: {e}")
+        return jsonify({'error': str(e)}), 504
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error during reverse image search: {e}")
         return jsonify({'error': str(e)}), 500
     
-def fetch_url_content(url, save_path):
+def fetch_url_content(url, capture_label):
     """
-    Fetch the HTML content from the given URL and save it to a file.
+    Fetch the HTML content from the given URL.
+    When debug capture is on (DEBUG_CAPTURE_DIR), a snapshot is saved off-thread.
     """
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        with metrics.STAGE_SECONDS.time(stage=f'twitter.fetch_{capture_label}'):
+            response = http_client.get(url, timeout=TWITTER_FETCH_TIMEOUT)
+            response.raise_for_status()
+        metrics.UPSTREAM_CALLS.inc(upstream=capture_label, outcome='ok')
 
-        with open(save_path, "w", encoding="utf-8") as file:
-            file.write(response.text)
-        print(f"HTML content saved to {save_path}")
+        debug_capture.capture(capture_label, response.text)
 
         return response.text
     except requests.exceptions.RequestException as e:
+        metrics.UPSTREAM_CALLS.inc(upstream=capture_label, outcome='error')
         print(f"Error fetching URL content: {e}")
         return None
 
+# Where Twitter profiles are fetched from
+NITTER_URL = os.getenv('NITTER_URL', "https://nitter.privacydev.net/")
+X_URL = os.getenv('X_URL', "https://x.com/")
+TWITTER_FETCH_TIMEOUT = 15  # seconds
+
+# Labels of the Nitter profile stats we extract
+TWITTER_STAT_LABELS = ["Tweets", "Following", "Followers", "Likes"]
+
+DEFAULT_TWITTER_AVATAR = "/pic/abs.twimg.com%2Fsticky%2Fdefault_profile_images%2Fdefault_profile_400x400.png"
+
 def extract_features_twitter(html_content, thtml_content, username):
     """
     Extract specified features from the HTML content.
+    Every element is looked up only once.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = bs4.BeautifulSoup(html_content, HTML_PARSER)
 
-    def safe_find(selector):
+    def text_of(element):
         """
-        Safely find an element by CSS selector and return its text or None if not found.
+        Return the stripped text of an element or None if it was not found.
         """
-        element = soup.select_one(selector)
         return element.text.strip() if element else None
 
-    def extract_stat(label):
+    def extract_stats():
         """
-        Extract numerical stats like followers, friends, likes, and tweets.
+        Extract numerical stats like followers, friends, likes, and tweets
+        in a single scan for all labels.
         """
-        stat_label = soup.find("span", string=label)
-        if stat_label:
+        stats = dict.fromkeys(TWITTER_STAT_LABELS)
+        found = set()
+        for stat_label in card.find_all("span", string=TWITTER_STAT_LABELS):
+            label = stat_label.string
+            if label in found:
+                continue  # Only the first occurrence counts
+            found.add(label)
             stat_value = stat_label.find_next("span", class_="profile-stat-num")
-            return int(stat_value.text.replace(",", "")) if stat_value else None
-        return None
+            stats[label] = int(stat_value.text.replace(",", "")) if stat_value else None
+        return stats
+
+    # Resolve every element once. Profile fields are looked up inside the
+    # profile card only, so a missing field doesn't cost a scan of the timeline.
+    card = soup.find("div", class_="profile-card") or soup
+    screen_name = text_of(card.select_one(".profile-card-username"))
+    joindate = card.find("div", class_="profile-joindate")
+    og_image = soup.select_one("meta[property='og:image']")
+    avatar = card.select_one(".profile-card-avatar img")
+    banner = soup.select_one(".profile-banner img")
+    stats = extract_stats()
 
     # Find the most recent tweet
     recent_tweet = soup.find("div", class_="timeline-item")
+    tweet_content = tweet_date_element = None
+    tweet_timestamp = "Unknown time"
+    if recent_tweet:
+        tweet_body = recent_tweet.find('div', class_='tweet-content media-body')
+        tweet_content = tweet_body.get_text(strip=True) if tweet_body else None
+        tweet_date_element = str(recent_tweet.find('span', class_='tweet-date'))
+        timestamp = recent_tweet.find('span', class_='tweet-date a')
+        if timestamp:
+            tweet_timestamp = timestamp['title']
 
     # Extract features
     profile_data = {
         "id": None,
         "id_str": None,
-        "screen_name": safe_find(".profile-card-username"),
-        "location": safe_find(".profile-location span:last-child"),  # Updated selector
-        "description": safe_find(".profile-bio p"),
-        "url": "https://x.com/" + safe_find(".profile-card-username") if safe_find(".profile-card-username") else None,  # Construct URL dynamically
-        "followers_count": extract_stat("Followers"),
-        "friends_count": extract_stat("Following"),
+        "screen_name": screen_name,
+        "location": text_of(card.select_one(".profile-location span:last-child")),
+        "description": text_of(card.select_one(".profile-bio p")),
+        "url": "https://x.com/" + screen_name if screen_name else None,  # Construct URL dynamically
+        "followers_count": stats["Followers"],
+        "friends_count": stats["Following"],
         "listed_count": None,
         "created_at": datetime.strptime(
-            soup.find("div", class_="profile-joindate").find("span", title=True)["title"], 
+            joindate.find("span", title=True)["title"],
             "%I:%M %p - %d %b %Y"
-        ).strftime("%a %b %d %H:%M") if soup.find("div", class_="profile-joindate") else None,  # Format datetime
-        "favorites_count": extract_stat("Likes"),
+        ).strftime("%a %b %d %H:%M") if joindate else None,  # Format datetime
+        "favorites_count": stats["Likes"],
         "verified": bool(soup.find("span", class_="verified-icon")),
-        "statuses_count": extract_stat("Tweets"),
+        "statuses_count": stats["Tweets"],
         "lang": "en", 
-        "status": recent_tweet.find('div', class_='tweet-content media-body').get_text(strip=True) if recent_tweet else None,  # Extract recent tweet content
-        "avatar_image": soup.select_one("meta[property='og:image']")['content'] if soup.select_one("meta[property='og:image']") else None,
+        "status": tweet_content,  # Recent tweet content
+        "avatar_image": og_image['content'] if og_image else None,
         "default_profile": None,
-        "default_profile_image": (
-            soup.select_one(".profile-card-avatar img")['src'] == "/pic/abs.twimg.com%2Fsticky%2Fdefault_profile_images%2Fdefault_profile_400x400.png"
-            if soup.select_one(".profile-card-avatar img")
-            else False
-        ),
-        "banner_image": soup.select_one(".profile-banner img")['src'] if soup.select_one(".profile-banner img") else None,
-        "first_tweet_date": str(recent_tweet.find('span', class_='tweet-date')) if recent_tweet else None,
+        "default_profile_image": avatar['src'] == DEFAULT_TWITTER_AVATAR if avatar else False,
+        "banner_image": banner['src'] if banner else None,
+        "first_tweet_date": tweet_date_element,
         "has_extended_profile": None,
-        "name": safe_find(".profile-card-fullname"),
+        "name": text_of(card.select_one(".profile-card-fullname")),
         # Corrected values
-        "tweet_content": recent_tweet.find('div', class_='tweet-content media-body').get_text(strip=True) if recent_tweet else None,
-        "tweet_date_element": str(recent_tweet.find('span', class_='tweet-date')) if recent_tweet else None,  # Already converted to string
-        "tweet_timestamp": recent_tweet.find('span', class_='tweet-date a')['title'] if recent_tweet and recent_tweet.find('span', class_='tweet-date a') else "Unknown time",
+        "tweet_content": tweet_content,
+        "tweet_date_element": tweet_date_element,  # Already converted to string
+        "tweet_timestamp": tweet_timestamp,
     }
 
     return profile_data
 
+def fetch_twitter_profile(username):
+    """
+    Fetches the Nitter and X pages of a user and extracts the profile features.
+    Returns None if the profile page could not be fetched.
+    """
+    # Construct URLs
+    url = NITTER_URL + username
+    turl = X_URL + username
+
+    # Fetch HTML content
+    html_content = fetch_url_content(url, "nitter")
+    thtml_content = fetch_url_content(turl, "x")
+
+    if not html_content:
+        return None
+    with metrics.STAGE_SECONDS.time(stage='twitter.parse'):
+        return extract_features_twitter(html_content, thtml_content, username)
+
+def get_twitter_profile(username):
+    """
+    Returns the extracted Twitter profile features, using the shared cache.
+    """
+    key = username.lower()
+    return inflight.do(('twitter', key), lambda: shared_cache.get_or_load(
+        'twitter_profile', key, lambda: fetch_twitter_profile(username)))
+
+def predict_twitter_profile(username):
+    """
+    Fetches a Twitter profile and scores it with the heuristic.
+    Returns None if the profile could not be fetched.
+    """
+    # Fetch and extract the profile (cached)
+    profile_info = get_twitter_profile(username)
+    if not profile_info:
+        return None
+
+    # --- Heuristic to estimate fake probability ---
+    with metrics.STAGE_SECONDS.time(stage='twitter.score'):
+        fake_probability = calculate_fake_probability(profile_info)
+
+    return {
+        'fake_probability': fake_probability,  # Return as 'fake_probability'
+        'is_fake': fake_probability > 0.5,  # Determine 'is_fake' based on threshold
+        'profile_info': profile_info
+    }
+
 @app.route('/predict_twitter', methods=['POST'])
 def predict_twitter():
     try:
@@ -367,103 +857,128 @@ def predict_twitter():
         username = data.get('username')
 
         if not username:
-            return jsonify({'error': 'Username is required'}), 400
-
-        # Construct URLs
-        url = "https://nitter.privacydev.net/" + username
-        turl = "https://x.com/" + username
-
-        # Fetch HTML content
-        html_content = fetch_url_content(url, "./output.html")
-        thtml_content = fetch_url_content(turl, "./toutput.html")
+            return jsonify({'error': MISSING_FIELD_ERRORS['username']}), 400
 
-        if html_content:
-            # Extract features
-            profile_info = extract_features_twitter(html_content, thtml_content, username)
+        response_data = predict_twitter_profile(username)
+        if response_data is None:
+            return jsonify({'error': 'Failed to fetch profile information'}), 500
+        return jsonify(response_data)
 
-            # --- Heuristic to estimate fake probability ---
-            fake_probability = calculate_fake_probability(profile_info)
+    except Exception as e:
+        print(f"Error during prediction: {e}")
+        return jsonify({'error': str(e)}), 500
 
-            response_data = {
-                'fake_probability': fake_probability,  # Return as 'fake_probability'
-                'is_fake': fake_probability > 0.5,  # Determine 'is_fake' based on threshold
+@app.route('/predict_twitter_batch', methods=['POST'])
+def predict_twitter_batch():
+    """
+    Scores a list of Twitter usernames. Profiles are fetched concurrently
+    and the rule table runs once over all of them.
+    """
+    try:
+        data = request.get_json()
+        usernames = data.get('usernames')
+
+        if not usernames or not isinstance(usernames, list):
+            return jsonify({'error': 'A list of usernames is required'}), 400
+        if not all(isinstance(username, str) and username.strip() for username in usernames):
+            return jsonify({'error': 'Every username must be a non-empty string'}), 400
+        if len(usernames) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} usernames per batch'}), 400
+
+        # Fetch all profiles at the same time
+        with ThreadPoolExecutor(max_workers=min(BATCH_FETCH_WORKERS, len(usernames))) as executor:
+            profiles = list(executor.map(lambda username: fetch_batch_item(get_twitter_profile, username),
+                                         usernames))
+
+        fetched = [profile_info for profile_info in profiles if profile_info]
+        with metrics.STAGE_SECONDS.time(stage='twitter.score'):
+            probabilities = iter(twitter_rules.fake_probabilities(fetched))
+
+        results = []
+        for username, profile_info in zip(usernames, profiles):
+            if not profile_info:
+                results.append({'username': username, 'error': 'Failed to fetch profile information'})
+                continue
+            fake_probability = next(probabilities)
+            results.append({
+                'username': username,
+                'fake_probability': fake_probability,
+                'is_fake': fake_probability > 0.5,
                 'profile_info': profile_info
-            }
-            return jsonify(response_data)
-        else:
-            return jsonify({'error': 'Failed to fetch profile information'}), 500
+            })
+
+        return jsonify({'results': results})
 
     except Exception as e:
-        print(f"Error during prediction: {e}")
+        print(f"Error during Twitter batch prediction: {e}")
         return jsonify({'error': str(e)}), 500
 
 def calculate_fake_probability(profile_info):
     """
-    Calculates an approximate fake probability based on Twitter profile features.
+    Calculates an approximate fake probability based on Twitter profile features
+    (see the rule table in twitter_rules.py).
     """
-    try:
-        # Initialize score
-        score = 0
-
-        # --- More comprehensive checks ---
-
-        # Account creation date
-        if profile_info['created_at'] is not None:
-            account_age_days = (datetime.now() - datetime.strptime(profile_info['created_at'], "%a %b %d %H:%M")).days
-            if account_age_days < 30:  
-                score += 3
-            elif account_age_days < 90:
-                score += 1
-
-        # Number of followers
-        if profile_info['followers_count'] < 10:  
-            score += 3
-        elif profile_info['followers_count'] < 100:
-            score += 1
-
-        # Number of friends (following)
-        if profile_info['friends_count'] > 1000:  
-            score += 2
-        elif profile_info['friends_count'] > 500:
-            score += 1
-
-        # Number of tweets
-        if profile_info['statuses_count'] < 10:  
-            score += 3
-        elif profile_info['statuses_count'] < 50:
-            score += 1
-
-        # Profile image
-        if profile_info['default_profile_image']:  
-            score += 2
-
-        # Profile description
-        if profile_info['description'] is None or len(profile_info['description']) < 10:  
-            score += 2
-
-        # Ratio of followers to friends
-        if profile_info['followers_count'] and profile_info['friends_count']:
-            if profile_info['followers_count'] / profile_info['friends_count'] < 0.1:
-                score += 2
-
-        # Check for suspicious keywords in username or description (example)
-        suspicious_keywords = ["bot", "promo", "cheap", "follow", "like"]
-        if any(keyword in profile_info['screen_name'].lower() for keyword in suspicious_keywords):
-            score += 2
-        if any(keyword in profile_info['description'].lower() for keyword in suspicious_keywords):
-            score += 1
-
-        # ... add more conditions based on other features ...
-
-        # Normalize score to a probability (0 to 1)
-        probability = min(score / 20, 1)  # Adjust the divisor as needed 
-
-        return probability
+    return twitter_rules.fake_probability(profile_info)
+
 
+def timed_stage(report, stage, func, *args):
+    """
+    Runs one stage of a profile report, recording its duration and any error.
+    """
+    start = time.perf_counter()
+    try:
+        return func(*args)
     except Exception as e:
-        print(f"Error calculating fake probability: {e}")
-        return 0.5  # Return a neutral probability on error
+        print(f"Error in profile report stage {stage}: {e}")
+        report['errors'][stage] = str(e)
+        return None
+    finally:
+        report['timings_ms'][stage] = round((time.perf_counter() - start) * 1000, 1)
+
+def build_profile_report(username):
+    """
+    Runs prediction, social links, Google search and reverse image search
+    for one username in parallel and returns a merged report.
+    """
+    start = time.perf_counter()
+    report = {'username': username, 'timings_ms': {}, 'errors': {}}
+
+    prediction_future = report_executor.submit(timed_stage, report, 'predict', predict_instagram, username)
+    social_links_future = report_executor.submit(
+        timed_stage, report, 'social_links', check_social_media_presence, username)
+    google_search_future = report_executor.submit(
+        timed_stage, report, 'google_search', gugl.gugl_search, username)
+
+    # The reverse image search needs the profile picture URL from the prediction stage
+    report['prediction'] = prediction_future.result()
+    reverse_search_future = None
+    if report['prediction'] is None:
+        report['errors'].setdefault('predict', 'Failed to fetch profile information')
+    elif report['prediction']['profile_info'].get('profile_pic_url'):
+        reverse_search_future = report_executor.submit(
+            timed_stage, report, 'reverse_search', reverse_image_search,
+            report['prediction']['profile_info']['profile_pic_url'])
+
+    report['social_links'] = social_links_future.result()
+    report['google_search'] = google_search_future.result()
+    report['reverse_search'] = reverse_search_future.result() if reverse_search_future else None
+    report['timings_ms']['total'] = round((time.perf_counter() - start) * 1000, 1)
+    return report
+
+@app.route('/profile_report', methods=['POST'])
+def profile_report():
+    try:
+        data = request.get_json()
+        username = data.get('username')
+
+        if not username:
+            return jsonify({'error': MISSING_FIELD_ERRORS['username']}), 400
+
+        return jsonify(build_profile_report(username))
 
+    except Exception as e:
+        print(f"Error building profile report: {e}")
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/google_search', methods=['POST'])
 def google_search_endpoint():
@@ -472,14 +987,16 @@ def google_search_endpoint():
         query = data.get('query')
 
         if not query:
-            return jsonify({'error': 'Query is required'}), 400
+            return jsonify({'error': MISSING_FIELD_ERRORS['query']}), 400
 
-        results = gugl.gugl_search(query)
+        stream_mode = requested_stream_mode()
+        if stream_mode:
+            events = ({'event': 'result', 'domain': domain, 'results': results}
+                      for domain, results in gugl.iter_gugl_search(query))
+            return stream_events(events, stream_mode)
 
-        # Print the results to the console
-        print("Google Search Results:")
-        for result in results:
-            print(result)
+        results = gugl.gugl_search(query)
+        print(f"Google search for {query!r} returned {len(results)} results")
 
         return jsonify({'results': results})
 
@@ -487,5 +1004,101 @@ def google_search_endpoint():
         print(f"Error in google_search_endpoint: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Lookups that can run as background jobs: type -> (required parameter, function).
+# A function returning None means the lookup failed.
+JOB_TYPES = {
+    'predict': ('username', predict_instagram),
+    'predict_twitter': ('username', predict_twitter_profile),
+    'social_links': ('username', lambda username: {'social_links': check_social_media_presence(username)}),
+    'reverse_search': ('image_url', reverse_image_search),
+    'google_search': ('query', lambda query: {'results': gugl.gugl_search(query)}),
+    'profile_report': ('username', build_profile_report),
+}
+
+def run_job(job_type, params):
+    param, lookup = JOB_TYPES[job_type]
+    result = lookup(params[param])
+    if result is None:
+        raise LookupError('Failed to fetch profile information')
+    return result
+
+job_queue = jobs.JobQueue(
+    run_job,
+    workers=int(os.getenv('JOB_WORKERS', 4)),
+    result_ttl=int(os.getenv('JOB_RESULT_TTL', 3600)),  # seconds
+    max_queued=int(os.getenv('JOB_MAX_QUEUED', 1000)),
+)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queues a lookup and returns its job ID at once. Body:
+    {"type": "social_links", "params": {"username": "..."}, "priority": "high|normal|low"}
+    The same type and params return the existing job while it's kept.
+    """
+    try:
+        data = request.get_json()
+        job_type = data.get('type')
+        params = data.get('params') or {}
+        priority = data.get('priority', 'normal')
+
+        if not isinstance(job_type, str) or job_type not in JOB_TYPES:
+            return jsonify({'error': f"type must be one of {', '.join(JOB_TYPES)}"}), 400
+        param = JOB_TYPES[job_type][0]
+        if not isinstance(params, dict) or not params.get(param):
+            return jsonify({'error': f'params.{param} is required'}), 400
+        if not isinstance(params[param], str) or not params[param].strip():
+            return jsonify({'error': f'params.{param} must be a non-empty string'}), 400
+        if not isinstance(priority, str) or priority not in jobs.PRIORITIES:
+            return jsonify({'error': f"priority must be one of {', '.join(jobs.PRIORITIES)}"}), 400
+
+        job, created = job_queue.submit(job_type, {param: params[param]}, priority)
+        response_data = {'job_id': job.id, 'status': job.status, 'deduplicated': not created}
+        return jsonify(response_data), 202 if created else 200, {'Location': f'/jobs/{job.id}'}
+
+    except jobs.QueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        print(f"Error submitting job: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Status of a job, with its result or error once it has finished.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Prometheus metrics: request and stage latency histograms, upstream call counters.
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """
+    Readiness probe. Lists every component with its load time.
+    With ?warm=1 all deferred components are loaded first.
+    """
+    if request.args.get('warm'):
+        components.load_all()
+    statuses = components.report()
+    is_ready = not any(status['error'] for status in statuses)
+    response_data = {'ready': is_ready, 'lazy_init': LAZY_INIT, 'components': statuses}
+    if instagram_session.loaded:
+        response_data['instagram_sessions'] = instagram_session.get().status()
+    return jsonify(response_data), 200 if is_ready else 503
+
+if not LAZY_INIT:
+    components.load_all()
+components.print_report(
+    f"App imported in {(time.perf_counter() - import_start) * 1000:.1f} ms "
+    f"({'lazy' if LAZY_INIT else 'eager'} init):")
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    app.run(debug=True, port=5000)  # Development server, see asgi.py for production
@@ -0,0 +1,247 @@
+"""
+ASGI entry point for production serving:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+/predict, /social_links, /reverse_search and /google_search are handled
+here as coroutines. The social media checks run on the shared aiohttp pool
+of async_engine. Blocking upstream libraries (Instaloader, the Google and
+reverse-search clients) run on bounded thread pools, and the coroutine only
+awaits them. A slow lookup then holds no server thread, and one process can
+keep hundreds of lookups in flight.
+
+Every other request, and streaming requests to these routes, go to the
+Flask app (app.py) on a bounded pool of worker threads, so they behave
+exactly as under the Flask server.
+"""
+import asyncio
+import io
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import app as backend
+import async_engine
+import gugl
+import metrics
+
+BLOCKING_WORKERS = 64  # Threads for blocking upstream calls made by the async routes
+WSGI_WORKERS = 32  # Threads for requests handled by the Flask app
+
+blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="asgi-blocking")
+wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_WORKERS, thread_name_prefix="asgi-wsgi")
+
+
+async def run_blocking(func, *args):
+    """Awaits a blocking function on the bounded thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(blocking_executor, func, *args)
+
+
+async def predict(username):
+    response_data = await run_blocking(backend.predict_instagram, username)
+    if response_data is None:
+        return 500, {'error': 'Failed to fetch profile information'}
+
+    print("Sent data (without social links):", response_data)
+    return 200, response_data
+
+
+async def social_links(username):
+    links = await async_engine.run_async(backend.get_social_links_async(username))
+    return 200, {'social_links': links}
+
+
+async def reverse_search(image_url):
+    try:
+        return 200, await run_blocking(backend.reverse_image_search, image_url)
+    except TimeoutError as e:
+        print(f"Error during reverse image search: {e}")
+        return 504, {'error': str(e)}
+    except ValueError as e:
+        return 400, {'error': str(e)}
+
+
+async def google_search(query):
+    results = await gugl.gugl_search_async(query)
+    print(f"Google search for {query!r} returned {len(results)} results")
+    return 200, {'results': results}
+
+
+# POST routes served as coroutines: path -> (required field, handler)
+ASYNC_ROUTES = {
+    '/predict': ('username', predict),
+    '/social_links': ('username', social_links),
+    '/reverse_search': ('image_url', reverse_search),
+    '/google_search': ('query', google_search),
+}
+
+
+def header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def wants_async_route(scope):
+    """True for JSON POSTs to ASYNC_ROUTES that don't ask for a streaming response."""
+    if scope['method'] != 'POST' or scope['path'] not in ASYNC_ROUTES:
+        return False
+    if (header(scope, b'content-type') or '').split(';')[0].strip() != 'application/json':
+        return False  # Leave the error response to Flask
+    query = parse_qs(scope['query_string'].decode('latin-1'))
+    if query.get('stream', [None])[0] in backend.STREAM_MIMETYPES:
+        return False
+    accept = header(scope, b'accept') or ''
+    return not any(mimetype in accept for mimetype in backend.STREAM_MIMETYPES.values())
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def send_json(scope, send, status, data):
+    body = (backend.app.json.dumps(data, separators=(',', ':')) + '\n').encode()
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    # Same headers as flask_cors with its defaults
+    origin = header(scope, b'origin')
+    if origin:
+        headers += [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    else:
+        headers.append((b'access-control-allow-origin', b'*'))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def handle_async_route(scope, send, data):
+    start = time.perf_counter()
+    field, handler = ASYNC_ROUTES[scope['path']]
+    try:
+        if data.get(field):
+            status, response_data = await handler(data[field])
+        else:
+            status, response_data = 400, {'error': backend.MISSING_FIELD_ERRORS[field]}
+    except Exception as e:
+        print(f"Error in {scope['path']}: {e}")
+        status, response_data = 500, {'error': str(e)}
+    await send_json(scope, send, status, response_data)
+    metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, route=scope['path'], method='POST', status=status)
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI http scope (PEP 3333)."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def handle_wsgi(scope, send, body):
+    """
+    Runs the Flask app on a worker thread. The response, streamed or not,
+    is iterated on that same thread and each chunk is sent from the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    environ = build_environ(scope, body)
+
+    def send_sync(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    def run():
+        response_start = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            response_start['status'] = int(status.split(' ', 1)[0])
+            response_start['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                         for name, value in response_headers]
+
+        def send_start():
+            send_sync({'type': 'http.response.start', **response_start})
+
+        result = backend.app(environ, start_response)
+        started = False
+        try:
+            for chunk in result:
+                if not chunk:
+                    continue
+                if not started:
+                    send_start()
+                    started = True
+                send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        if not started:
+            send_start()
+        send_sync({'type': 'http.response.body', 'body': b''})
+
+    await loop.run_in_executor(wsgi_executor, run)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return  # No websockets
+
+    body = await read_body(receive)
+    if wants_async_route(scope):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            await handle_async_route(scope, send, data)
+            return
+    await handle_wsgi(scope, send, body)  # Invalid JSON too: Flask answers with its usual error
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(application, port=5000)
@@ -0,0 +1,93 @@
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+import aiohttp
+
+# Connection pool limits for the shared aiohttp session
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 10
+DNS_CACHE_TTL = 300  # seconds
+DEFAULT_TIMEOUT = 30  # seconds per request, unless the call passes its own
+
+_loop = None
+_session = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """
+    Returns the background event loop, starting it on first use.
+    All async work of the app runs on this one loop so the aiohttp
+    session (and its connection pool) can be shared between requests.
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="async-engine", daemon=True)
+            thread.start()
+    return _loop
+
+
+def run(coro, timeout=None):
+    """
+    Runs a coroutine on the background loop and blocks until it finishes.
+    Safe to call from any Flask worker thread.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    return future.result(timeout)
+
+
+async def run_async(coro):
+    """
+    Awaits a coroutine on the background loop from another event loop
+    (e.g. the ASGI server's), so it can use the shared session.
+    """
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, get_loop()))
+
+
+def iter_completed(coros, timeout=None):
+    """
+    Runs a dict of {key: coroutine} on the background loop and yields
+    (key, result) pairs in completion order. Coroutines still running when
+    the caller stops iterating are cancelled.
+    """
+    loop = get_loop()
+    futures = {asyncio.run_coroutine_threadsafe(coro, loop): key for key, coro in coros.items()}
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout):
+            yield futures[future], future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def get_session():
+    """
+    Returns the shared aiohttp session. Must be awaited on the background loop.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT))
+    return _session
+
+
+async def _close_session():
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+
+@atexit.register
+def close():
+    """Closes the shared session (and its pooled connections) at exit."""
+    if _loop is not None and _loop.is_running():
+        try:
+            run(_close_session(), timeout=5)
+        except Exception as e:
+            print(f"Error closing HTTP session: {e}")
@@ -0,0 +1,181 @@
+import threading
+import time
+from functools import lru_cache
+from itertools import combinations
+
+import cache
+from phash import hamming_distance
+
+# Local index of the profile picture hashes (64-bit pHash, see phash.py) of
+# every account we have fetched, to spot the same photo on several accounts
+# without a reverse image search. Fake-account rings tend to reuse stolen
+# photos, which resized or recompressed still hash within a few bits.
+#
+# Hashes are kept in memory in multi-index hashing tables for fast
+# Hamming-radius queries, and in an SQLite database on disk so the index
+# survives restarts. Every row records when the account was last seen with
+# that picture, which decides its latest one. Rows written by other worker
+# processes sharing the database are picked up every SYNC_INTERVAL seconds.
+
+SYNC_INTERVAL = 5  # seconds between reads of rows written by other processes
+SYNC_OVERLAP = 60  # seconds re-read on every sync, for rows committed after later ones
+
+SIGN_BIT = 1 << 63
+
+
+def to_signed(value):
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value & SIGN_BIT else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class MultiIndex:
+    """
+    Multi-index hashing of distinct 64-bit hashes for Hamming-radius queries.
+    Each hash is split into CHUNKS 16-bit chunks, with one table per chunk
+    position. Two hashes within radius r have at least one chunk within
+    r // CHUNKS bits of each other, so a query only looks at the buckets of
+    the chunks near its own, then checks the full distance of those hashes.
+    """
+
+    CHUNKS = 4
+    CHUNK_BITS = 16
+
+    def __init__(self):
+        self._tables = [{} for _ in range(self.CHUNKS)]  # chunk -> hashes with that chunk
+        self._hashes = set()
+
+    @property
+    def size(self):
+        return len(self._hashes)
+
+    def chunks(self, value):
+        mask = (1 << self.CHUNK_BITS) - 1
+        return [(value >> (i * self.CHUNK_BITS)) & mask for i in range(self.CHUNKS)]
+
+    def add(self, value):
+        """Adds a hash. Returns False if it was already in the index."""
+        if value in self._hashes:
+            return False
+        self._hashes.add(value)
+        for table, chunk in zip(self._tables, self.chunks(value)):
+            table.setdefault(chunk, []).append(value)
+        return True
+
+    def search(self, value, radius):
+        """Returns [(hash, distance), ...] of the hashes within radius of value."""
+        flips = chunk_flips(self.CHUNK_BITS, radius // self.CHUNKS)
+        candidates = set()
+        for table, chunk in zip(self._tables, self.chunks(value)):
+            for flip in flips:
+                bucket = table.get(chunk ^ flip)
+                if bucket:
+                    candidates.update(bucket)
+        found = []
+        for candidate in candidates:
+            distance = hamming_distance(value, candidate)
+            if distance <= radius:
+                found.append((candidate, distance))
+        return found
+
+
+@lru_cache(maxsize=None)
+def chunk_flips(bits, radius):
+    """Every mask of the given width with at most radius bits set."""
+    return [
+        sum(1 << bit for bit in positions)
+        for count in range(radius + 1)
+        for positions in combinations(range(bits), count)
+    ]
+
+
+class AvatarIndex:
+    """
+    Which accounts use which profile picture hashes. path is an SQLite
+    database, or None to keep the index in memory only.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._index = MultiIndex()
+        self._accounts = {}  # hash -> set of usernames that used it
+        self._latest = {}  # username -> (seen_at, hash) of its latest profile picture
+        self._synced_until = 0.0  # Latest seen_at read from the database
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+        if path:
+            self._connections = cache.SQLiteConnections(path)
+            conn = self._connections.get()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS avatars ("
+                " id INTEGER PRIMARY KEY,"
+                " username TEXT NOT NULL,"
+                " phash INTEGER NOT NULL,"
+                " seen_at REAL NOT NULL,"
+                " UNIQUE (username, phash))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS avatars_seen_at ON avatars (seen_at)")
+            conn.commit()
+            self.sync()
+
+    def _insert(self, username, value, seen_at):
+        """Adds to the in-memory index. Call with the lock held."""
+        self._index.add(value)
+        self._accounts.setdefault(value, set()).add(username)
+        latest = self._latest.get(username)
+        if latest is None or seen_at >= latest[0]:
+            self._latest[username] = (seen_at, value)
+
+    def sync(self):
+        """Reads the rows written to the database since the last sync."""
+        if not self.path:
+            return
+        rows = self._connections.get().execute(
+            "SELECT username, phash, seen_at FROM avatars WHERE seen_at > ?",
+            (self._synced_until - SYNC_OVERLAP,),
+        ).fetchall()
+        with self._lock:
+            for username, value, seen_at in rows:
+                self._insert(username, to_unsigned(value), seen_at)
+                self._synced_until = max(self._synced_until, seen_at)
+            self._last_sync = time.monotonic()
+
+    def add(self, username, value):
+        """Records that username has a profile picture with hash value, as of now."""
+        username = username.lower()
+        seen_at = time.time()
+        with self._lock:
+            self._insert(username, value, seen_at)
+        if self.path:
+            conn = self._connections.get()
+            conn.execute(
+                "INSERT INTO avatars (username, phash, seen_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (username, phash) DO UPDATE SET seen_at = excluded.seen_at",
+                (username, to_signed(value), seen_at),
+            )
+            conn.commit()
+
+    def other_accounts(self, username, radius):
+        """
+        Usernames of other accounts that used a profile picture within radius
+        bits of username's latest one, or None if username has none indexed.
+        """
+        if self.path and time.monotonic() - self._last_sync >= SYNC_INTERVAL:
+            self.sync()
+        username = username.lower()
+        with self._lock:
+            latest = self._latest.get(username)
+            if latest is None:
+                return None
+            accounts = set()
+            for match, _ in self._index.search(latest[1], radius):
+                accounts |= self._accounts[match]
+        accounts.discard(username)
+        return accounts
+
+    def stats(self):
+        with self._lock:
+            return {"hashes": self._index.size, "accounts": len(self._latest)}
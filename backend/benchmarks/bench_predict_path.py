@@ -0,0 +1,92 @@
+"""
+Micro-benchmark of the per-request /predict path after the profile fetch:
+feature extraction, scaling and model inference for a single row.
+
+  legacy   list of features -> pd.DataFrame -> scaler.transform -> predict + predict_proba
+  numpy    FeatureVector -> NumPy scaling -> predict_proba
+  native   FeatureVector -> model.cbm (scaler folded in) -> predict_proba
+
+Run from the backend directory:
+    python benchmarks/bench_predict_path.py [iterations]
+"""
+import os
+import sys
+import timeit
+import types
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import export_model  # noqa: E402
+import features  # noqa: E402
+
+warnings.filterwarnings("ignore")  # sklearn version warnings when unpickling the scaler
+
+PROFILE = types.SimpleNamespace(
+    username="jane_doe1987", full_name="Jane Doe", biography="Coffee, travel and cats.",
+    external_url=None, is_private=False, mediacount=42, followers=310, followees=280,
+)
+
+
+def legacy_predict(model, scaler, profile):
+    """The /predict path before the pandas-free rewrite."""
+    nums_length_username = sum(c.isdigit() for c in profile.username) / len(profile.username)
+    fullname_words = len(profile.full_name.split())
+    nums_length_fullname = sum(c.isdigit() for c in profile.full_name) / max(len(profile.full_name), 1)
+    name_equals_username = 1 if profile.full_name.replace(" ", "").lower() == profile.username.lower() else 0
+    activity_ratio = np.round(profile.mediacount / profile.followers, 2) if profile.followers else 0
+    row = [
+        1, nums_length_username, fullname_words, nums_length_fullname, name_equals_username,
+        len(profile.biography), 1 if profile.external_url else 0, 1 if profile.is_private else 0,
+        profile.mediacount, profile.followers, profile.followees, activity_ratio,
+        1 if profile.followers > profile.followees else 0,
+    ]
+    input_data = pd.DataFrame([row], columns=features.FEATURE_NAMES)
+    scaled_input_data = scaler.transform(input_data)
+    prediction = model.predict(scaled_input_data)
+    fake_probability = float(model.predict_proba(scaled_input_data)[:, 1])
+    return fake_probability, bool(prediction[0])
+
+
+def numpy_predict(model, scaler, profile):
+    vector = features.FeatureVector.from_profile(profile, 1)
+    input_data = (features.stack([vector]) - scaler.mean_) / scaler.scale_
+    fake_probability = model.predict_proba(input_data)[0, 1]
+    return float(fake_probability), bool(fake_probability > 0.5)
+
+
+def native_predict(model, profile):
+    vector = features.FeatureVector.from_profile(profile, 1)
+    fake_probability = model.predict_proba(features.stack([vector]))[0, 1]
+    return float(fake_probability), bool(fake_probability > 0.5)
+
+
+def bench(label, func, iterations, baseline=None):
+    seconds = min(timeit.repeat(func, number=iterations, repeat=5))
+    per_call_us = seconds / iterations * 1e6
+    speedup = f"  ({baseline / per_call_us:.1f}x)" if baseline else ""
+    print(f"{label:<8} {per_call_us:10.1f} us/request{speedup}")
+    return per_call_us
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    model, scaler = export_model.load_pickled_model()
+    native = export_model.load_native_model() if os.path.exists(export_model.NATIVE_MODEL_PATH) else None
+
+    expected = legacy_predict(model, scaler, PROFILE)
+    assert np.isclose(numpy_predict(model, scaler, PROFILE)[0], expected[0], rtol=0, atol=1e-12)
+
+    baseline = bench("legacy", lambda: legacy_predict(model, scaler, PROFILE), iterations)
+    bench("numpy", lambda: numpy_predict(model, scaler, PROFILE), iterations, baseline)
+    if native is not None:
+        assert np.isclose(native_predict(native, PROFILE)[0], expected[0], rtol=0, atol=1e-12)
+        bench("native", lambda: native_predict(native, PROFILE), iterations, baseline)
+    else:
+        print("native   skipped, run export_model.py first")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Offline throughput benchmark of the backend.
+
+Starts the fixture server (benchmarks/fixture_server.py) in place of
+Instagram, Nitter/X, the social networks and Google, serves app.py on a
+local port, and drives the endpoints at a given concurrency. Reports
+p50/p95/p99 latency and requests per second for each endpoint.
+
+Run from the backend directory:
+    python benchmarks/bench_service.py --requests 200 --concurrency 16 --latency-ms 50
+
+By default every request uses a new username/query, so the caches never hit.
+Use --users to cycle through fewer usernames and --cache to enable the
+shared cache (in memory). --server asgi serves asgi.py with uvicorn instead
+of the threaded werkzeug server.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from werkzeug.serving import make_server
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+from benchmarks.fixture_server import FixtureServer  # noqa: E402
+
+ENDPOINTS = {
+    "/predict": lambda name: {"username": name},
+    "/predict_twitter": lambda name: {"username": name},
+    "/predict_twitter_batch": lambda name: {"usernames": [f"{name}x{i}" for i in range(10)]},
+    "/social_links": lambda name: {"username": name},
+    "/google_search": lambda name: {"query": name},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight at once")
+    parser.add_argument("--latency-ms", type=float, default=50, help="delay added to every upstream response")
+    parser.add_argument("--users", type=int, default=0, help="distinct usernames to cycle through (0 = all distinct)")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured requests per endpoint")
+    parser.add_argument("--cache", action="store_true", help="enable the shared cache (memory backend)")
+    parser.add_argument("--server", choices=["wsgi", "asgi"], default="wsgi", help="werkzeug (app.py) or uvicorn (asgi.py)")
+    parser.add_argument("--verbose", action="store_true", help="show the app's log output")
+    return parser.parse_args()
+
+
+def start_app(fixtures, use_cache, server_type):
+    """Imports app.py wired to the fixture server and serves it on a free port."""
+    os.environ["LAZY_INIT"] = "1"  # Nothing may reach the real Instagram at import
+    os.environ["CACHE_BACKEND"] = "memory" if use_cache else "none"
+    os.environ["NITTER_URL"] = f"{fixtures.url}/nitter/"
+    os.environ["X_URL"] = f"{fixtures.url}/x/"
+    os.environ["RATE_LIMITS"] = "google.com=1000/1000"  # Searches are answered by the fixture server
+    os.environ["AVATAR_INDEX_PATH"] = ""  # Keep the avatar index of the fixture profiles in memory
+    os.chdir(BACKEND_DIR)
+
+    import app
+    import gugl
+    import instaloader
+    import session_pool
+
+    # Instagram: the real Profile.from_username, answered by the fixture server
+    loader = instaloader.Instaloader(quiet=True)
+    loader.context.get_iphone_json = (
+        lambda path, params: requests.get(f"{fixtures.url}/instagram/{path}", params=params, timeout=30).json())
+    app.instagram_session.set(session_pool.SessionPool([session_pool.PooledSession("bench", loader)]))
+
+    app.SOCIAL_PLATFORMS = {platform: f"{fixtures.url}/social/{platform}/{{}}" for platform in app.SOCIAL_PLATFORMS}
+
+    def search(term, num_results=10):
+        response = requests.get(f"{fixtures.url}/google/search", params={"q": term}, timeout=30)
+        return response.json()["results"][:num_results]
+    gugl.search = search
+
+    if server_type == "asgi":
+        return start_asgi_server()
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="app-server", daemon=True).start()
+    return server.shutdown, f"http://127.0.0.1:{server.server_port}"
+
+
+def start_asgi_server():
+    import asgi
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(asgi.application, log_level="error", backlog=4096))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, name="app-server", daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def shutdown():
+        server.should_exit = True
+    return shutdown, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def run_endpoint(base_url, endpoint, names, concurrency):
+    """Sends one request per name. Returns (latencies in seconds, errors, wall time)."""
+    local = threading.local()
+
+    def send(name):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = local.session.post(base_url + endpoint, json=ENDPOINTS[endpoint](name), timeout=120)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, names))
+    wall = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results])
+    errors = sum(1 for _, ok in results if not ok)
+    return latencies, errors, wall
+
+
+def main():
+    args = parse_args()
+    fixtures = FixtureServer(latency_ms=args.latency_ms).start()
+    log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    if not args.verbose:
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    rows = []
+    with log:
+        shutdown, base_url = start_app(fixtures, args.cache, args.server)
+        for endpoint in args.endpoints:
+            prefix = endpoint.strip("/").replace("_", "")
+            run_endpoint(base_url, endpoint, [f"warmup{prefix}{i}" for i in range(args.warmup)], args.concurrency)
+            users = args.users or args.requests
+            names = [f"bench{prefix}{i % users}" for i in range(args.requests)]
+            upstream_before = fixtures.requests
+            latencies, errors, wall = run_endpoint(base_url, endpoint, names, args.concurrency)
+            rows.append((endpoint, latencies, errors, wall, fixtures.requests - upstream_before))
+        shutdown()
+    fixtures.stop()
+
+    print(f"requests/endpoint={args.requests} concurrency={args.concurrency} "
+          f"upstream latency={args.latency_ms:g}ms cache={'on' if args.cache else 'off'} server={args.server}")
+    print(f"{'endpoint':<24}{'ok':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'upstream':>10}")
+    for endpoint, latencies, errors, wall, upstream in rows:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        print(f"{endpoint:<24}{len(latencies) - errors:>6}{errors:>5}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}"
+              f"{len(latencies) / wall:>9.1f}{upstream:>10}")
+
+
+if __name__ == "__main__":
+    main()
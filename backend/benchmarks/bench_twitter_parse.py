@@ -0,0 +1,115 @@
+"""
+Benchmark of extract_features_twitter() against the saved output.html fixture.
+
+Compares the single-pass extractor in app.py with the previous
+implementation (kept below as legacy_extract_features_twitter) on both
+BeautifulSoup backends, and checks that they return the same data.
+
+Run from the backend directory:
+    python benchmarks/bench_twitter_parse.py [iterations]
+"""
+import os
+import sys
+import timeit
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app  # noqa: E402
+
+FIXTURE = "output.html"
+
+
+def legacy_extract_features_twitter(html_content, thtml_content, username):
+    """
+    Previous implementation of app.extract_features_twitter(), kept as the baseline.
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    def safe_find(selector):
+        element = soup.select_one(selector)
+        return element.text.strip() if element else None
+
+    def extract_stat(label):
+        stat_label = soup.find("span", string=label)
+        if stat_label:
+            stat_value = stat_label.find_next("span", class_="profile-stat-num")
+            return int(stat_value.text.replace(",", "")) if stat_value else None
+        return None
+
+    recent_tweet = soup.find("div", class_="timeline-item")
+
+    profile_data = {
+        "id": None,
+        "id_str": None,
+        "screen_name": safe_find(".profile-card-username"),
+        "location": safe_find(".profile-location span:last-child"),
+        "description": safe_find(".profile-bio p"),
+        "url": "https://x.com/" + safe_find(".profile-card-username") if safe_find(".profile-card-username") else None,
+        "followers_count": extract_stat("Followers"),
+        "friends_count": extract_stat("Following"),
+        "listed_count": None,
+        "created_at": datetime.strptime(
+            soup.find("div", class_="profile-joindate").find("span", title=True)["title"],
+            "%I:%M %p - %d %b %Y"
+        ).strftime("%a %b %d %H:%M") if soup.find("div", class_="profile-joindate") else None,
+        "favorites_count": extract_stat("Likes"),
+        "verified": bool(soup.find("span", class_="verified-icon")),
+        "statuses_count": extract_stat("Tweets"),
+        "lang": "en",
+        "status": recent_tweet.find('div', class_='tweet-content media-body').get_text(strip=True) if recent_tweet else None,
+        "avatar_image": soup.select_one("meta[property='og:image']")['content'] if soup.select_one("meta[property='og:image']") else None,
+        "default_profile": None,
+        "default_profile_image": (
+            soup.select_one(".profile-card-avatar img")['src'] == "/pic/abs.twimg.com%2Fsticky%2Fdefault_profile_images%2Fdefault_profile_400x400.png"
+            if soup.select_one(".profile-card-avatar img")
+            else False
+        ),
+        "banner_image": soup.select_one(".profile-banner img")['src'] if soup.select_one(".profile-banner img") else None,
+        "first_tweet_date": str(recent_tweet.find('span', class_='tweet-date')) if recent_tweet else None,
+        "has_extended_profile": None,
+        "name": safe_find(".profile-card-fullname"),
+        "tweet_content": recent_tweet.find('div', class_='tweet-content media-body').get_text(strip=True) if recent_tweet else None,
+        "tweet_date_element": str(recent_tweet.find('span', class_='tweet-date')) if recent_tweet else None,
+        "tweet_timestamp": recent_tweet.find('span', class_='tweet-date a')['title'] if recent_tweet and recent_tweet.find('span', class_='tweet-date a') else "Unknown time",
+    }
+
+    return profile_data
+
+
+def bench(label, func, html, iterations):
+    seconds = min(timeit.repeat(lambda: func(html, None, "fixture"), number=iterations, repeat=3))
+    per_call_ms = seconds / iterations * 1000
+    print(f"{label:<40} {per_call_ms:8.2f} ms/call")
+    return per_call_ms
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with open(FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+
+    expected = legacy_extract_features_twitter(html, None, "fixture")
+    baseline = bench("legacy (html.parser, repeated lookups)", legacy_extract_features_twitter, html, iterations)
+
+    parsers = ["html.parser"]
+    if app.HTML_PARSER != "html.parser":
+        parsers.append(app.HTML_PARSER)
+
+    default_parser = app.HTML_PARSER
+    try:
+        for parser in parsers:
+            app.HTML_PARSER = parser
+            result = app.extract_features_twitter(html, None, "fixture")
+            if result != expected:
+                diff = {k: (expected[k], result[k]) for k in expected if expected[k] != result[k]}
+                print(f"  WARNING: {parser} output differs from legacy: {diff}")
+            per_call_ms = bench(f"single-pass ({parser})", app.extract_features_twitter, html, iterations)
+            print(f"  speedup: {baseline / per_call_ms:.2f}x")
+    finally:
+        app.HTML_PARSER = default_parser
+
+
+if __name__ == "__main__":
+    main()
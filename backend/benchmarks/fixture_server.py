@@ -0,0 +1,110 @@
+"""
+Local stand-in for the upstream services, replaying recorded responses:
+
+  /instagram/api/v1/users/web_profile_info/?username=<u>  Instagram profile JSON
+  /avatars/<name>.jpg                                    profile pictures
+  /nitter/<u>, /x/<u>                                    output.html / toutput.html
+  /social/<platform>/<u>                                 a social network profile page
+  /google/search?q=<query>                               Google result URLs (JSON)
+
+Usernames starting with "missing" don't exist on Instagram. Every response
+can be delayed to simulate upstream latency.
+"""
+import json
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_fixture(*path):
+    with open(os.path.join(*path), "rb") as f:
+        return f.read()
+
+
+class FixtureServer:
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.fixtures = {
+            "instagram_profile": read_fixture(FIXTURES_DIR, "instagram_profile.json").decode(),
+            "google_search": json.loads(read_fixture(FIXTURES_DIR, "google_search.json")),
+            "social_profile": read_fixture(FIXTURES_DIR, "social_profile.html"),
+            "avatar_custom": read_fixture(FIXTURES_DIR, "avatar_custom.jpg"),
+            "avatar_default": read_fixture(BACKEND_DIR, "igdefault.jpg"),
+            "nitter": read_fixture(BACKEND_DIR, "output.html"),
+            "x": read_fixture(BACKEND_DIR, "toutput.html"),
+        }
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="fixture-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+
+    def avatar_url(self, username):
+        # About one in four accounts keeps the default picture
+        kind = "default" if zlib.crc32(username.encode()) % 4 == 0 else "custom"
+        return f"{self.url}/avatars/{kind}.jpg"
+
+    def route(self, path, query):
+        """Returns (status, content type, body) for a request."""
+        parts = [part for part in path.split("/") if part]
+        if path.startswith("/instagram/api/v1/users/web_profile_info"):
+            username = query.get("username", [""])[0]
+            if username.startswith("missing"):
+                return 200, "application/json", b'{"data": {"user": null}, "status": "ok"}'
+            body = (self.fixtures["instagram_profile"]
+                    .replace("{username}", username)
+                    .replace("{avatar_url}", self.avatar_url(username)))
+            return 200, "application/json", body.encode()
+        if parts[:1] == ["avatars"] and len(parts) == 2:
+            kind = parts[1].split(".")[0]
+            return 200, "image/jpeg", self.fixtures[f"avatar_{kind}"]
+        if parts[:1] in (["nitter"], ["x"]):
+            return 200, "text/html; charset=utf-8", self.fixtures[parts[0]]
+        if parts[:1] == ["social"]:
+            return 200, "text/html; charset=utf-8", self.fixtures["social_profile"]
+        if path == "/google/search":
+            q = query.get("q", [""])[0]
+            for suffix, urls in self.fixtures["google_search"].items():
+                if q.endswith(" " + suffix):
+                    term = q[:-len(suffix) - 1]
+                    body = json.dumps({"results": [url.replace("{query}", term) for url in urls]})
+                    return 200, "application/json", body.encode()
+            return 200, "application/json", b'{"results": []}'
+        return 404, "text/plain", b"not found"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real upstreams
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                url = urlparse(self.path)
+                status, content_type, body = server.route(url.path, parse_qs(url.query))
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,280 @@
+"""
+Scores a list of Instagram usernames, one per line, from a file or stdin.
+
+Results are appended to a JSONL or CSV file as they come in. A checkpoint
+next to the output records how far the input has been scored, so an
+interrupted run picks up where it stopped when started again with the same
+input and output. Nothing that is already in the output is fetched again.
+
+Run from the backend directory:
+    python bulk_score.py usernames.txt -o scores.jsonl
+    cat usernames.txt | python bulk_score.py - -o scores.csv --concurrency 16
+    python bulk_score.py usernames.txt -o scores.jsonl --local   # no server, score in-process
+
+By default every username goes to a running backend's /predict over one
+pooled HTTP session. Fetching, caching and rate limiting happen there.
+With --local the app is imported and its Instagram session pool and model
+are used directly.
+
+Failures that may pass (no answer, or a 429, 502, 503 or 504 from the
+backend) are retried with backoff. Lines that still fail are not written and stay above
+the checkpoint, so the next run scores them again; the run stops when
+MAX_CONSECUTIVE_FAILURES lines in a row fail this way (e.g. the backend is
+down). Other errors, such as profiles that can't be fetched (deleted or
+missing accounts), are written as rows with an "error"; --retry-errors
+scores those lines again, and the last row of a line is its result.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import http_client
+
+API_URL = "http://127.0.0.1:5000/predict"
+API_TIMEOUT = 120  # seconds per username
+CHECKPOINT_EVERY = 5  # seconds between checkpoint writes
+RETRIES = 3  # extra attempts for a failure that may pass
+TRANSIENT_STATUSES = (429, 502, 503, 504)  # Backend answers retried like connection errors
+RETRY_BACKOFF = 2  # seconds before the first retry; doubles on every retry
+MAX_CONSECUTIVE_FAILURES = 20  # unresolved lines in a row before the run stops
+CSV_FIELDS = ["line", "username", "fake_probability", "is_fake", "error"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="file with one username per line, or - for stdin")
+    parser.add_argument("-o", "--output", required=True, help="results file (.csv for CSV, else JSONL)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="output format (default: from the file name)")
+    parser.add_argument("--concurrency", type=int, default=8, help="usernames scored at the same time")
+    parser.add_argument("--api-url", default=API_URL, help="the backend's /predict URL")
+    parser.add_argument("--local", action="store_true", help="score in-process instead of calling the backend")
+    parser.add_argument("--retry-errors", action="store_true", help="score lines with an error row again")
+    return parser.parse_args()
+
+
+class Checkpoint:
+    """
+    Input lines below `line` are all in the output. Lines at or above it
+    that finished early (out of order) are found again by reading the output.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.line = 0
+        if os.path.exists(path):
+            with open(path) as f:
+                self.line = json.load(f)["line"]
+
+    def save(self, line):
+        self.line = line
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"line": line}, f)
+        os.replace(tmp_path, self.path)
+
+
+def truncate_partial_line(path):
+    """Drops a last line cut short by an interruption, so appends start on a fresh line."""
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            chunk_start = max(0, position - 65536)
+            f.seek(chunk_start)
+            chunk = f.read(position - chunk_start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(chunk_start + newline + 1)
+                return
+            position = chunk_start
+        f.truncate(0)
+
+
+def read_results(path, fmt):
+    """Maps every input line number in the output to whether its last row is an error."""
+    failed = {}
+    with open(path, newline="") as f:
+        rows = csv.DictReader(f) if fmt == "csv" else map(json.loads, f)
+        for row in rows:
+            failed[int(row["line"])] = bool(row.get("error"))
+    return failed
+
+
+class ResultWriter:
+    def __init__(self, path, fmt):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", newline="")
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if new_file:
+                self.csv.writeheader()
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self.csv.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class TransientError(Exception):
+    """A failure that may pass if the line is scored again later."""
+
+
+def api_scorer(api_url):
+    def score(username):
+        # Connection errors and timeouts are raised as they are, and retried too
+        response = http_client.post(api_url, json={"username": username}, timeout=API_TIMEOUT)
+        if response.status_code in TRANSIENT_STATUSES:
+            raise TransientError(f"HTTP {response.status_code}: {response.text[:200]}")
+        if response.status_code != 200:
+            # Includes the 500 /predict answers for a profile it can't fetch,
+            # written as an error row like --local does
+            try:
+                error = response.json().get("error")
+            except ValueError:
+                error = None
+            return {"error": error or f"HTTP {response.status_code}"}
+        return response.json()
+    return score
+
+
+def local_scorer():
+    os.environ.setdefault("LAZY_INIT", "1")  # Load only what scoring needs
+    import app
+
+    def score(username):
+        result = app.predict_instagram(username)
+        return result if result is not None else {"error": "Failed to fetch profile information"}
+    return score
+
+
+def read_usernames(input_file, skip):
+    """Yields (line number, username) of the input, leaving out blank and skipped lines."""
+    for line_number, line in enumerate(input_file):
+        username = line.strip()
+        if username and not skip(line_number):
+            yield line_number, username
+
+
+def run(args):
+    """Scores the input. Returns the exit status."""
+    fmt = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+    checkpoint = Checkpoint(f"{args.output}.checkpoint")
+    first_line = checkpoint.line
+    done = set()
+    if os.path.exists(args.output):
+        truncate_partial_line(args.output)
+        results = read_results(args.output, fmt)
+        if args.retry_errors:
+            first_line = 0
+            done = {line for line, failed in results.items() if not failed}
+            print(f"Scoring again {len(results) - len(done)} lines with errors", file=sys.stderr)
+        else:
+            done = {line for line in results if line >= first_line}
+            print(f"Resuming after line {first_line} ({len(done)} later lines already done)", file=sys.stderr)
+
+    score = local_scorer() if args.local else api_scorer(args.api_url)
+    writer = ResultWriter(args.output, fmt)
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    usernames = read_usernames(input_file, lambda line: line < first_line or line in done)
+
+    def score_one(line_number, username):
+        """Returns the result row, or None if the line failed every attempt."""
+        for attempt in range(RETRIES + 1):
+            try:
+                return {"line": line_number, "username": username, **score(username)}
+            except Exception as e:
+                if attempt == RETRIES:
+                    print(f"Giving up on line {line_number} ({username}) for this run: {e}", file=sys.stderr)
+                    return None
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    pending = {}  # future -> input line number
+    unresolved = set()  # Lines that failed every attempt; the checkpoint stays below them
+    next_line = first_line  # Line after the last one handed out
+    scored = errors = consecutive_failures = 0
+    status = 0
+    start = last_checkpoint = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=args.concurrency)
+
+    def watermark():
+        return min([*pending.values(), *unresolved], default=next_line)
+
+    try:
+        exhausted = False
+        while True:
+            # Keep the pool busy without reading the whole input up front
+            while not exhausted and len(pending) < args.concurrency * 2:
+                item = next(usernames, None)
+                if item is None:
+                    exhausted = True
+                    break
+                line_number, username = item
+                pending[executor.submit(score_one, line_number, username)] = line_number
+                next_line = line_number + 1
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                row = future.result()
+                line_number = pending.pop(future)
+                if row is None:
+                    unresolved.add(line_number)
+                    consecutive_failures += 1
+                    continue
+                consecutive_failures = 0
+                writer.write(row)
+                scored += 1
+                errors += "error" in row
+
+            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                print(f"Stopping: {consecutive_failures} lines in a row failed, is the backend up?",
+                      file=sys.stderr)
+                status = 1
+                break
+
+            if time.monotonic() - last_checkpoint >= CHECKPOINT_EVERY:
+                writer.flush()  # Results first, then the checkpoint that covers them
+                checkpoint.save(watermark())
+                last_checkpoint = time.monotonic()
+                rate = scored / (last_checkpoint - start)
+                print(f"{scored} scored ({errors} errors, {len(unresolved)} unresolved), {rate:.1f}/s, "
+                      f"at line {checkpoint.line}", file=sys.stderr)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)  # Unfinished lines stay above the checkpoint
+        writer.close()
+        checkpoint.save(watermark())
+        if input_file is not sys.stdin:
+            input_file.close()
+
+    print(f"Done: {scored} scored ({errors} errors, {len(unresolved)} unresolved) in "
+          f"{time.monotonic() - start:.1f}s", file=sys.stderr)
+    if unresolved and not status:
+        print("Run again with the same arguments to score the unresolved lines", file=sys.stderr)
+    return status
+
+
+def main():
+    try:
+        sys.exit(run(parse_args()))
+    except KeyboardInterrupt:
+        print("Interrupted, run again with the same arguments to resume", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction.
+
+    If stale_ttl is set, entries that expired less than stale_ttl seconds ago
+    are still served (stale-while-revalidate) while a background thread
+    reloads them.
+    """
+
+    def __init__(self, maxsize, ttl, stale_ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, load):
+        """
+        Returns the cached value for key, calling load() on a miss.
+        load() returning None means "do not cache" (e.g. a failed fetch).
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if now < expires_at:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if now < expires_at + self.stale_ttl:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, load), daemon=True).start()
+                    return value
+                del self._data[key]
+            self.misses += 1
+
+        value = load()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def _refresh(self, key, load):
+        try:
+            value = load()
+            if value is not None:
+                self.set(key, value)
+        except Exception as e:
+            print(f"Error refreshing cache entry {key!r}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
+
+
+class CacheBackend:
+    """
+    Interface for caches shared between worker processes.
+
+    Entries are grouped by namespace (the data type, e.g. "instagram_profile")
+    and each namespace has its own expiry in seconds. Values must be
+    JSON-serializable.
+    """
+
+    def __init__(self, ttls=None, default_ttl=3600):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+
+    def ttl_for(self, namespace):
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace, key):
+        """Returns the cached value, or None if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, namespace, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, namespace, key):
+        raise NotImplementedError
+
+    def get_or_load(self, namespace, key, load):
+        """
+        Returns the cached value, calling load() on a miss.
+        load() returning None means "do not cache".
+        """
+        value = self.get(namespace, key)
+        if value is not None:
+            return value
+        value = load()
+        if value is not None:
+            self.set(namespace, key, value)
+        return value
+
+
+class NullBackend(CacheBackend):
+    """Backend that never stores anything (caching disabled)."""
+
+    def get(self, namespace, key):
+        return None
+
+    def set(self, namespace, key, value, ttl=None):
+        pass
+
+    def delete(self, namespace, key):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process backend, for single-worker setups and development."""
+
+    def __init__(self, ttls=None, default_ttl=3600):
+        super().__init__(ttls, default_ttl)
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del self._data[(namespace, key)]
+                return None
+            return json.loads(value)
+
+    def set(self, namespace, key, value, ttl=None):
+        ttl = self.ttl_for(namespace) if ttl is None else ttl
+        with self._lock:
+            self._data[(namespace, key)] = (json.dumps(value), time.time() + ttl)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data.pop((namespace, key), None)
+
+
+class SQLiteConnections:
+    """
+    Connections to an SQLite database in WAL mode, so every worker process
+    on the same host can read and write it concurrently. sqlite3 connections
+    can't be shared between threads, so there is one per thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.get().execute("PRAGMA journal_mode=WAL")
+
+    def get(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Backend stored in an SQLite database in WAL mode, so every worker
+    process on the same host can read and write it concurrently.
+    """
+
+    PURGE_EVERY = 1000  # writes between purges of expired rows
+
+    def __init__(self, path, ttls=None, default_ttl=3600):
+        super().__init__(ttls, default_ttl)
+        self.path = path
+        self._connections = SQLiteConnections(path)
+        self._writes = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.commit()
+
+    def _connection(self):
+        return self._connections.get()
+
+    def get(self, namespace, key):
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace, key, value, ttl=None):
+        ttl = self.ttl_for(namespace) if ttl is None else ttl
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), time.time() + ttl),
+        )
+        conn.commit()
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def delete(self, namespace, key):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+        conn.commit()
+
+    def purge_expired(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+
+
+def backend_from_env(ttls=None, default_ttl=3600):
+    """
+    Builds the shared cache backend selected by the CACHE_BACKEND
+    environment variable ("sqlite", "memory" or "none").
+    """
+    kind = os.getenv("CACHE_BACKEND", "sqlite").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(os.getenv("CACHE_PATH", "cache.sqlite3"), ttls, default_ttl)
+    if kind == "memory":
+        return MemoryBackend(ttls, default_ttl)
+    if kind == "none":
+        return NullBackend(ttls, default_ttl)
+    raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
@@ -0,0 +1,105 @@
+import importlib
+import threading
+import time
+
+# Heavy subsystems of the app (model, Instagram session, OpenCV, ...).
+# Each one is loaded once, either at startup or, with LAZY_INIT, on first use,
+# and its load time is recorded for the startup report and /ready.
+
+
+class Component:
+    """A subsystem that is loaded once, on the first call to get()."""
+
+    def __init__(self, name, load):
+        self.name = name
+        self._load = load
+        self._lock = threading.Lock()
+        self.value = None
+        self.loaded = False
+        self.load_seconds = None
+        self.error = None
+
+    def get(self):
+        if self.loaded:
+            return self.value
+        with self._lock:
+            if not self.loaded:
+                start = time.perf_counter()
+                try:
+                    self.value = self._load()
+                except Exception as e:
+                    self.error = str(e)
+                    raise  # Not marked as loaded, so the next call retries
+                finally:
+                    self.load_seconds = time.perf_counter() - start
+                self.error = None
+                self.loaded = True
+        return self.value
+
+    def set(self, value):
+        """Sets the value directly instead of loading it (e.g. for benchmarks)."""
+        with self._lock:
+            self.value = value
+            self.error = None
+            self.load_seconds = 0.0
+            self.loaded = True
+
+    def status(self):
+        return {
+            "name": self.name,
+            "loaded": self.loaded,
+            "load_ms": round(self.load_seconds * 1000, 1) if self.load_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+class LazyModule:
+    """
+    Stand-in for a module. The module is imported (through its component)
+    on the first attribute access, so call sites like pd.DataFrame stay unchanged.
+    """
+
+    def __init__(self, component):
+        self._component = component
+
+    def __getattr__(self, attr):
+        return getattr(self._component.get(), attr)
+
+
+registry = {}
+
+
+def register(name, load):
+    component = Component(name, load)
+    registry[name] = component
+    return component
+
+
+def lazy_import(module_name, name=None):
+    component = register(name or module_name, lambda: importlib.import_module(module_name))
+    return LazyModule(component)
+
+
+def load_all():
+    """Loads every registered component. Failures are reported, not raised."""
+    for component in registry.values():
+        try:
+            component.get()
+        except Exception as e:
+            print(f"Error loading {component.name}: {e}")
+
+
+def report():
+    return [component.status() for component in registry.values()]
+
+
+def print_report(title):
+    print(title)
+    for status in report():
+        if status["error"]:
+            state = f"failed ({status['error']})"
+        elif status["loaded"]:
+            state = f"{status['load_ms']:8.1f} ms"
+        else:
+            state = "deferred"
+        print(f"  {status['name']:<20} {state}")
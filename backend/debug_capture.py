@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import os
+import queue
+import threading
+
+# Debug capture of fetched HTML pages. Off unless DEBUG_CAPTURE_DIR is set.
+# Snapshots are written by a background thread as gzip files named after
+# their content hash, and only the newest DEBUG_CAPTURE_MAX_FILES are kept.
+QUEUE_SIZE = 64  # pages waiting to be written; more are dropped
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_writer = None
+_lock = threading.Lock()
+dropped = 0
+
+
+def capture_dir():
+    return os.getenv('DEBUG_CAPTURE_DIR')
+
+
+def max_files():
+    return int(os.getenv('DEBUG_CAPTURE_MAX_FILES', 200))
+
+
+def capture(label, content):
+    """
+    Queues a page for writing. Never blocks and does nothing when capture is off.
+    """
+    global dropped
+    directory = capture_dir()
+    if not directory or content is None:
+        return
+    _ensure_writer()
+    try:
+        _queue.put_nowait((directory, label, content))
+    except queue.Full:
+        dropped += 1
+
+
+def _ensure_writer():
+    global _writer
+    with _lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, name="debug-capture", daemon=True)
+            _writer.start()
+
+
+def _write_loop():
+    while True:
+        directory, label, content = _queue.get()
+        try:
+            path = _write_snapshot(directory, label, content)
+            print(f"HTML content saved to {path}")
+            _prune(directory)
+        except OSError as e:
+            print(f"Error writing debug capture: {e}")
+        finally:
+            _queue.task_done()
+
+
+def _write_snapshot(directory, label, content):
+    data = content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{label}-{digest}.html.gz")
+
+    if os.path.exists(path):
+        os.utime(path)  # Same content seen again, mark it as recent
+        return path
+
+    # Write to a temporary name first so readers never see a partial file
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _prune(directory):
+    snapshots = [
+        entry for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.endswith(".html.gz")
+    ]
+    excess = len(snapshots) - max_files()
+    if excess <= 0:
+        return
+    snapshots.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in snapshots[:excess]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
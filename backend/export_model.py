@@ -0,0 +1,179 @@
+"""
+Exports the pickled CatBoost model and sklearn scaler to a single native
+CatBoost model (model/model.cbm) with the scaler folded into the split borders.
+
+StandardScaler is a per-feature affine map with a positive scale, so a split
+"(x - mean) / scale > border" is the same as "x > border * scale + mean".
+Rewriting every border that way gives a model that takes raw features.
+
+Run from the backend directory:
+    python export_model.py          # export, then check parity on model/test.csv
+    python export_model.py --check  # only check parity of an existing export
+"""
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier
+
+MODEL_PATH = './model/model.pkl'
+SCALER_PATH = './model/scaler.pkl'
+NATIVE_MODEL_PATH = './model/model.cbm'
+TEST_CSV_PATH = './model/test.csv'
+
+# Max allowed difference between pickle and native fake probabilities
+PARITY_TOLERANCE = 1e-6
+
+
+def load_pickled_model():
+    with open(MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    with open(SCALER_PATH, 'rb') as f:
+        scaler = pickle.load(f)
+    return model, scaler
+
+
+def load_native_model(path=NATIVE_MODEL_PATH):
+    """Loads the exported model. It takes raw (unscaled) features."""
+    model = CatBoostClassifier()
+    model.load_model(path, format='cbm')
+    return model
+
+
+def fold_scaler(model_json, scaler):
+    """
+    Rewrites the float feature borders of a CatBoost JSON model so the model
+    takes raw features instead of scaler output.
+    """
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(scaler.n_features_in_)
+    scale = scaler.scale_ if scaler.with_std else np.ones(scaler.n_features_in_)
+    if np.any(scale <= 0):
+        raise ValueError("Cannot fold a scaler with non-positive scale into the model")
+
+    def unscale(border, feature_index):
+        # CatBoost compares float32 values, so "border * scale + mean" alone can
+        # land a value that sat exactly on a scaled border on the other side.
+        # Step to the largest float32 raw border that still splits the same way.
+        # A raw float32 value is judged by its shortest decimal form (0.3, 56.0),
+        # which is what the feature values look like before the cast.
+        border32 = np.float32(border)
+
+        def goes_right(x):
+            value = float(str(np.float32(x)))
+            return np.float32((value - mean[feature_index]) / scale[feature_index]) > border32
+
+        raw_border = np.float32(border * scale[feature_index] + mean[feature_index])
+        while goes_right(raw_border):
+            raw_border = np.nextafter(raw_border, np.float32(-np.inf))
+        while not goes_right(np.nextafter(raw_border, np.float32(np.inf))):
+            raw_border = np.nextafter(raw_border, np.float32(np.inf))
+        return float(raw_border)
+
+    for feature in model_json['features_info']['float_features']:
+        index = feature['feature_index']
+        feature['borders'] = [unscale(border, index) for border in feature['borders']]
+
+    for tree in model_json['oblivious_trees']:
+        for split in tree['splits']:
+            if split['split_type'] != 'FloatFeature':
+                raise ValueError(f"Unsupported split type: {split['split_type']}")
+            split['border'] = unscale(split['border'], split['float_feature_index'])
+
+    return model_json
+
+
+def export(path=NATIVE_MODEL_PATH):
+    model, scaler = load_pickled_model()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'model.json')
+        model.save_model(json_path, format='json')
+        with open(json_path) as f:
+            model_json = json.load(f)
+
+        with open(json_path, 'w') as f:
+            json.dump(fold_scaler(model_json, scaler), f)
+
+        native = CatBoostClassifier()
+        native.load_model(json_path, format='json')
+
+    native.save_model(path, format='cbm')
+    print(f"Exported model with folded scaler to {path}")
+
+
+def load_test_features(path=TEST_CSV_PATH):
+    """
+    Builds the 13-column feature matrix of the model from test.csv, which
+    only has the 11 raw columns. The derived columns are computed like in
+    app.extract_features_instaloader().
+    """
+    data = pd.read_csv(path)
+    followers = data['#followers'].to_numpy(dtype=np.float64)
+    follows = data['#follows'].to_numpy(dtype=np.float64)
+    posts = data['#posts'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        activity_ratio = np.where(followers > 0, np.round(posts / followers, 2), 0)
+    features = data.drop(columns=['fake'])
+    features['activity ratio'] = activity_ratio
+    features['#followers > #follows?'] = (followers > follows).astype(np.int64)
+    return features
+
+
+def check_parity(path=NATIVE_MODEL_PATH):
+    """
+    Compares the exported model with the pickled model and scaler on
+    test.csv, and prints load time and single-row latency of both.
+    Returns True if they agree.
+    """
+    start = time.perf_counter()
+    model, scaler = load_pickled_model()
+    pickle_load_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    native = load_native_model(path)
+    native_load_ms = (time.perf_counter() - start) * 1000
+
+    features = load_test_features()
+    expected = model.predict_proba(scaler.transform(features))[:, 1]
+    actual = native.predict_proba(features.to_numpy(dtype=np.float64))[:, 1]
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    label_mismatches = int(np.sum((expected > 0.5) != (actual > 0.5)))
+    print(f"Rows: {len(features)}, max probability difference: {max_diff:.2e}, "
+          f"label mismatches: {label_mismatches}")
+
+    row = features.iloc[[0]]
+    raw_row = row.to_numpy(dtype=np.float64)
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        model.predict_proba(scaler.transform(row))
+    pickle_predict_ms = (time.perf_counter() - start) * 1000 / runs
+    start = time.perf_counter()
+    for _ in range(runs):
+        native.predict_proba(raw_row)
+    native_predict_ms = (time.perf_counter() - start) * 1000 / runs
+
+    print(f"{'':<10} {'load':>10} {'1-row predict':>15}")
+    print(f"{'pickle':<10} {pickle_load_ms:8.1f}ms {pickle_predict_ms:13.3f}ms")
+    print(f"{'native':<10} {native_load_ms:8.1f}ms {native_predict_ms:13.3f}ms")
+
+    return max_diff <= PARITY_TOLERANCE and label_mismatches == 0
+
+
+def main():
+    if '--check' not in sys.argv:
+        export()
+    if not check_parity():
+        print("Parity check FAILED")
+        sys.exit(1)
+    print("Parity check passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import numpy as np
+
+# Column order expected by the scaler and the model
+FEATURE_NAMES = ['profile pic', 'nums/length username', 'fullname words',
+                 'nums/length fullname', 'name==username', 'description length',
+                 'external URL', 'private', '#posts', '#followers', '#follows',
+                 'activity ratio', '#followers > #follows?']
+FEATURE_INDEX = {name: index for index, name in enumerate(FEATURE_NAMES)}
+N_FEATURES = len(FEATURE_NAMES)
+
+
+class FeatureVector:
+    """
+    Model input for one Instagram profile: a float64 array with one value
+    per entry of FEATURE_NAMES, in that order.
+    """
+
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (N_FEATURES,):
+            raise ValueError(f"Expected {N_FEATURES} feature values, got shape {values.shape}")
+        self.values = values
+
+    @classmethod
+    def from_profile(cls, profile, profile_pic):
+        """
+        Builds the features of an instaloader Profile. profile_pic is 1 for
+        a custom profile picture, 0 for a default one.
+        """
+        username = profile.username
+        full_name = profile.full_name
+        num_posts = profile.mediacount
+        num_followers = profile.followers
+        num_follows = profile.followees
+
+        values = np.empty(N_FEATURES, dtype=np.float64)
+        values[0] = profile_pic
+        values[1] = sum(c.isdigit() for c in username) / len(username)
+        values[2] = len(full_name.split())
+        values[3] = sum(c.isdigit() for c in full_name) / max(len(full_name), 1)
+        values[4] = 1 if full_name.replace(" ", "").lower() == username.lower() else 0
+        values[5] = len(profile.biography)
+        values[6] = 1 if profile.external_url else 0
+        values[7] = 1 if profile.is_private else 0
+        values[8] = num_posts
+        values[9] = num_followers
+        values[10] = num_follows
+        values[11] = np.round(num_posts / num_followers, 2) if num_followers else 0
+        values[12] = 1 if num_followers > num_follows else 0
+        return cls(values)
+
+    def __getitem__(self, name):
+        return self.values[FEATURE_INDEX[name]]
+
+    def to_list(self):
+        """Plain list of the values, e.g. for JSON."""
+        return self.values.tolist()
+
+
+def stack(vectors):
+    """Stacks FeatureVectors into an (n, N_FEATURES) matrix for the model."""
+    matrix = np.empty((len(vectors), N_FEATURES), dtype=np.float64)
+    for row, vector in enumerate(vectors):
+        matrix[row] = vector.values
+    return matrix
@@ -1,41 +1,163 @@
 from google_img_source_search import ReverseImageSearcher
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from urllib.parse import urlsplit
+import hashlib
 import json
+import mimetypes
+import os
+import tempfile
+import threading
+import requests
+import cache
+import http_client
+import metrics
+import ratelimit
+import singleflight
+
+# Reverse image search on Google Lens, limited to Twitter and Instagram pages.
+# Images on the Instagram and Twitter CDNs are downloaded once and searched
+# by their bytes, and results are cached by the SHA-256 of those bytes, so
+# the same avatar behind different (e.g. expiring) URLs is searched only
+# once. Any other URL is never fetched by us: Google fetches it, and the
+# results are cached by URL. Searches run on a small shared pool with a
+# timeout; a search that times out still finishes in the background and its
+# result is cached for the next request.
+
+SITES = ["twitter.com", "instagram.com"]
+DOWNLOAD_HOSTS = ["cdninstagram.com", "fbcdn.net", "twimg.com"]  # Matched by suffix, https only
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+SEARCH_WORKERS = 4  # Shared by all requests
+SEARCH_TIMEOUT = 30  # seconds a caller waits for a search
+SEARCH_CACHE_SIZE = 1024
+SEARCH_CACHE_TTL = 24 * 3600  # seconds
+
+executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="foto")
+search_cache = cache.TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+inflight = singleflight.Group()
+
+_searcher = None
+_searcher_lock = threading.Lock()
+
+def get_searcher():
+    """
+    Returns the shared searcher. It has a session of its own (the searcher
+    adds cookies and hooks to it), with the pooling and rate limiting of http_client.
+    """
+    global _searcher
+    with _searcher_lock:
+        if _searcher is None:
+            _searcher = ReverseImageSearcher(session=http_client.create_session())
+    return _searcher
+
+def check_image_url(image_url):
+    """
+    Raises ValueError for anything but an http(s) URL. Returns True if the
+    image is on a CDN we download from ourselves.
+    """
+    parts = urlsplit(image_url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("Image URL must be an http(s) URL")
+    host = parts.hostname.lower()
+    return parts.scheme == "https" and any(host == suffix or host.endswith("." + suffix)
+                                           for suffix in DOWNLOAD_HOSTS)
+
+def download_image(image_url):
+    """
+    Returns (content, content type) of an image on DOWNLOAD_HOSTS, read up
+    to MAX_IMAGE_BYTES. Redirects are not followed.
+    """
+    with http_client.get(image_url, stream=True, allow_redirects=False) as response:
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"HTTP {response.status_code} for the image", response=response)
+        if int(response.headers.get('Content-Length') or 0) > MAX_IMAGE_BYTES:
+            raise ValueError(f"Image is larger than {MAX_IMAGE_BYTES} bytes")
+        chunks, size = [], 0
+        for chunk in response.iter_content(64 * 1024):
+            size += len(chunk)
+            if size > MAX_IMAGE_BYTES:
+                raise ValueError(f"Image is larger than {MAX_IMAGE_BYTES} bytes")
+            chunks.append(chunk)
+        return b''.join(chunks), response.headers.get('Content-Type', '').split(';')[0].strip()
+
+def lens_search(search, image):
+    """
+    Runs a searcher method (search or search_by_file) and returns the
+    matching Twitter and Instagram pages and the number of matches on all sites.
+    """
+    try:
+        results = search(image)
+    except requests.exceptions.HTTPError as e:
+        # The searcher's raise_for_status hook fires before http_client sees
+        # the status, so feed it to the rate limiter here
+        ratelimit.report_status(e.response.url, e.response.status_code)
+        metrics.UPSTREAM_CALLS.inc(upstream='google_images', outcome='http_error')
+        raise
+    except Exception:
+        metrics.UPSTREAM_CALLS.inc(upstream='google_images', outcome='error')
+        raise
+    metrics.UPSTREAM_CALLS.inc(upstream='google_images', outcome='ok')
+
+    matches = [
+        {'site': search_item.page_url, 'image': search_item.image_url, 'title': search_item.page_title}
+        for search_item in results
+        if any(site in search_item.page_url for site in SITES)
+    ]
+    return {'matches': matches, 'total': len(results)}
+
+def search_image_bytes(image, content_type):
+    """Searches for downloaded image bytes, uploaded from a temporary file."""
+    suffix = mimetypes.guess_extension(content_type) or '.jpg'
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        f.write(image)
+    try:
+        return lens_search(get_searcher().search_by_file, f.name)
+    finally:
+        os.remove(f.name)
+
+def search_image_url(image_url):
+    """Searches for an image that Google fetches itself."""
+    return lens_search(get_searcher().search, image_url)
+
+def cache_late_result(key, future):
+    if not future.cancelled() and future.exception() is None:
+        search_cache.set(key, future.result())
+
+def cached_search(key, search, *args):
+    """search(*args) through the cache, waiting at most SEARCH_TIMEOUT seconds."""
+    def load():
+        future = executor.submit(search, *args)
+        try:
+            return future.result(timeout=SEARCH_TIMEOUT)
+        except TimeoutError:
+            future.add_done_callback(lambda future: cache_late_result(key, future))
+            raise TimeoutError(f"Reverse image search took longer than {SEARCH_TIMEOUT}s") from None
+
+    return search_cache.get_or_load(key, lambda: inflight.do(('google_images', key), load))
 
 def reverse_image_search(image_url, max_results=10):
-    # Create an instance of ReverseImageSearcher
-    rev_img_searcher = ReverseImageSearcher()
-    
-    # Perform the reverse image search
-    results = rev_img_searcher.search(image_url)
-    
-    # Check if results were returned
-    if results:
-        output = {'results': []}  # Initialize JSON output
-        filtered_results = []
-
-        # Filter results for Twitter and Instagram
-        for search_item in results:
-            if 'twitter.com' in search_item.page_url or 'instagram.com' in search_item.page_url:
-                filtered_results.append(search_item)
-
-        # Prepare JSON output
-        for index, search_item in enumerate(filtered_results):
-            if index < max_results:
-                output['results'].append({
-                    'site': search_item.page_url,
-                    'image': search_item.image_url
-                })
-        
-        if not filtered_results:
-            output['message'] = 'No results found for Twitter or Instagram.'
-        
-        # Print JSON output
-        print(json.dumps(output, indent=4))
+    """
+    Returns {'image_sha256', 'results': [{'site', 'image', 'title'}, ...]},
+    with a 'message' when nothing was found on Twitter or Instagram.
+    image_sha256 is None for images that weren't downloaded.
+    Raises ValueError for unsupported URLs and TimeoutError if the search
+    takes longer than SEARCH_TIMEOUT.
+    """
+    if check_image_url(image_url):
+        image, content_type = download_image(image_url)
+        digest = hashlib.sha256(image).hexdigest()
+        found = cached_search(('sha256', digest), search_image_bytes, image, content_type)
     else:
-        # Print message for no results
-        print(json.dumps({'message': 'No results found.'}, indent=4))
+        digest = None
+        found = cached_search(('url', image_url), search_image_url, image_url)
+
+    output = {'image_sha256': digest, 'results': found['matches'][:max_results]}
+    if not found['total']:
+        output['message'] = 'No results found.'
+    elif not found['matches']:
+        output['message'] = 'No results found for Twitter or Instagram.'
+    return output
 
 if __name__ == "__main__":
     # Input: Image URL
     image_url = input("Enter the image URL: ")
-    reverse_image_search(image_url)
+    print(json.dumps(reverse_image_search(image_url), indent=4))
@@ -1,4 +1,19 @@
+import asyncio
 from googlesearch import search
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import cache
+import metrics
+import ratelimit
+
+DOMAINS = ["x.com", "github.com", "instagram.com", "linkedin.com"]
+GOOGLE_HOST = "www.google.com"  # Rate limiter key of the searches
+
+SEARCH_WORKERS = 8  # Shared by all requests
+SEARCH_CACHE_SIZE = 2048
+SEARCH_CACHE_TTL = 6 * 3600  # seconds
+
+executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="gugl")
+search_cache = cache.TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
 
 def google_search(query, domain=None, num_results=10):
     results = []
@@ -17,23 +32,64 @@ def google_search(query, domain=None, num_results=10):
 
     return results
 
+def cached_google_search(query, domain, num_results):
+    """
+    google_search() with a TTL cache per (query, domain). Failed searches
+    are logged, return an empty list and are not cached.
+    """
+    def load():
+        try:
+            ratelimit.acquire(GOOGLE_HOST)
+            with metrics.STAGE_SECONDS.time(stage='google.search'):
+                results = google_search(query, domain, num_results)
+            metrics.UPSTREAM_CALLS.inc(upstream='google', outcome='ok')
+            ratelimit.report_status(GOOGLE_HOST, 200)
+            return results
+        except Exception as e:
+            metrics.UPSTREAM_CALLS.inc(upstream='google', outcome='error')
+            response = getattr(e, 'response', None)
+            if response is not None:
+                ratelimit.report_status(GOOGLE_HOST, response.status_code)
+            print(f"Error searching {domain}: {e}")
+            return None
+
+    results = search_cache.get_or_load((query, domain, num_results), load)
+    return results if results is not None else []
+
+def iter_gugl_search(query, num_results=5):
+    """
+    Runs the per-domain searches concurrently and yields (domain, results)
+    as each domain finishes.
+    """
+    futures = {
+        executor.submit(cached_google_search, query, domain, num_results): domain
+        for domain in DOMAINS
+    }
+    for future in as_completed(futures):
+        yield futures[future], future.result()
+
 def gugl_search(query):
-    domains = ["x.com", "github.com", "instagram.com", "linkedin.com"]
+    results_by_domain = dict(iter_gugl_search(query, num_results=5))  # Limit to 5 results per domain
     all_results = []
-    for domain in domains:
-        results = google_search(query, domain, num_results=5)  # Limit to 5 results per domain
-        all_results.extend(results)
+    for domain in DOMAINS:  # Keep the results in domain order
+        all_results.extend(results_by_domain[domain])
     return all_results
 
+async def gugl_search_async(query):
+    """
+    gugl_search() for coroutines: awaits the searches on the shared executor
+    without blocking the event loop.
+    """
+    searches = [asyncio.wrap_future(executor.submit(cached_google_search, query, domain, 5)) for domain in DOMAINS]
+    return [link for results in await asyncio.gather(*searches) for link in results]
+
 def main():
     query_string = input("Enter your search query: ").strip()
-    domains = ["x.com", "github.com", "instagram.com", "linkedin.com"]
     
     num_results = 10
 
-    for domain in domains:
+    for domain, results in iter_gugl_search(query_string, num_results):
         print(f"\nResults from {domain}:")
-        results = google_search(query_string, domain, num_results)
         for link in results:
             print(link)
 
@@ -0,0 +1,72 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import ratelimit
+
+# Shared outbound HTTP client for the blocking (requests based) fetch paths.
+# One session per process keeps connections alive and pooled per host,
+# and every call gets a default timeout, retries with backoff and waits
+# for its host's rate limiter (see ratelimit.py).
+# The async paths share the aiohttp session of async_engine instead.
+
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds, used when a call passes none
+POOL_CONNECTIONS = 32  # Hosts with a pool of their own
+POOL_MAXSIZE = 16  # Kept-alive connections per host
+RETRY_TOTAL = 2
+RETRY_BACKOFF = 0.3  # seconds; doubles on every retry
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session = None
+_lock = threading.Lock()
+
+
+class Session(requests.Session):
+    """
+    A requests.Session that applies DEFAULT_TIMEOUT when a call passes none
+    and paces every call through the rate limiter of its host.
+    """
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        try:
+            ratelimit.acquire(url)
+        except ratelimit.RateLimited as e:
+            raise requests.exceptions.ConnectionError(f"Rate limited: {e}") from e
+        response = super().request(method, url, **kwargs)
+        ratelimit.report_status(url, response.status_code)
+        return response
+
+
+def create_session():
+    retry = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),  # Only idempotent calls are retried
+        raise_on_status=False,  # Hand the last response back instead of raising
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session = Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """Returns the shared session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = create_session()
+    return _session
+
+
+def get(url, **kwargs):
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_session().post(url, **kwargs)
@@ -0,0 +1,159 @@
+import heapq
+import itertools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+import metrics
+
+# In-process queue for long-running lookups. Jobs are run by a fixed pool
+# of worker threads, highest priority first, so a burst of slow lookups
+# waits its turn instead of holding request threads. Submitting the same
+# job (type and parameters) again returns the existing job while it is
+# queued, running or its result is still kept. Results are dropped
+# result_ttl seconds after the job finished.
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class QueueFull(Exception):
+    """Raised when max_queued jobs are already waiting."""
+
+
+class Job:
+    def __init__(self, job_type, params, priority):
+        self.id = uuid.uuid4().hex
+        self.type = job_type
+        self.params = params
+        self.priority = priority
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def to_dict(self):
+        data = {
+            "job_id": self.id,
+            "type": self.type,
+            "params": self.params,
+            "priority": next(name for name, value in PRIORITIES.items() if value == self.priority),
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == "done":
+            data["result"] = self.result
+        elif self.status == "failed":
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    def __init__(self, run, workers=4, result_ttl=3600, max_queued=1000):
+        """run(job_type, params) does the work of a job and returns its result."""
+        self.run = run
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.max_queued = max_queued
+        self._jobs = {}  # id -> Job
+        self._by_key = {}  # (type, params) -> Job
+        self._heap = []  # (priority, sequence, job); entries of re-prioritized jobs are skipped
+        self._sequence = itertools.count()
+        self._expiry = deque()  # (expires_at, job) in finishing order
+        self._queued = 0
+        self._threads = []
+        self._lock = threading.Lock()
+        self._has_work = threading.Condition(self._lock)
+
+    @staticmethod
+    def key(job_type, params):
+        return job_type, json.dumps(params, sort_keys=True)
+
+    def submit(self, job_type, params, priority="normal"):
+        """
+        Queues a job, or returns the existing one for the same type and
+        parameters. Returns (job, created).
+        """
+        level = PRIORITIES[priority]
+        key = self.key(job_type, params)
+        with self._lock:
+            self._purge_expired()
+            job = self._by_key.get(key)
+            if job is not None and job.status != "failed":
+                if job.status == "queued" and level < job.priority:
+                    job.priority = level  # Move it up the queue
+                    heapq.heappush(self._heap, (level, next(self._sequence), job))
+                return job, False
+
+            if self._queued >= self.max_queued:
+                raise QueueFull(f"{self._queued} jobs are already queued")
+            job = Job(job_type, params, level)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            heapq.heappush(self._heap, (level, next(self._sequence), job))
+            self._queued += 1
+            self._start_workers()
+            self._has_work.notify()
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            self._purge_expired()
+            statuses = [job.status for job in self._jobs.values()]
+            return {status: statuses.count(status) for status in ("queued", "running", "done", "failed")}
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self):
+        with self._lock:
+            while True:
+                while self._heap:
+                    priority, _, job = heapq.heappop(self._heap)
+                    if job.status == "queued" and priority == job.priority:
+                        job.status = "running"
+                        job.started_at = time.time()
+                        self._queued -= 1
+                        return job
+                self._has_work.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            try:
+                result = self.run(job.type, job.params)
+                status, error = "done", None
+            except Exception as e:
+                print(f"Error in {job.type} job {job.id}: {e}")
+                result, status, error = None, "failed", str(e)
+            with self._lock:
+                job.result, job.error, job.status = result, error, status
+                job.finished_at = time.time()
+                self._expiry.append((time.monotonic() + self.result_ttl, job))
+            metrics.JOBS.inc(type=job.type, status=status)
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, job = self._expiry.popleft()
+            self._jobs.pop(job.id, None)
+            key = self.key(job.type, job.params)
+            if self._by_key.get(key) is job:
+                del self._by_key[key]
@@ -0,0 +1,120 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal Prometheus-style metrics (counters and histograms with labels),
+# rendered in the text exposition format by render().
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+registry = []
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(zip(self.labelnames, key))
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the duration of the with-block, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                base = list(zip(self.labelnames, key))
+                for bound, count in zip(self.buckets, state):
+                    labels = _format_labels(base + [("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(base + [('le', '+Inf')])} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(base)} {state[-2]!r}")
+                lines.append(f"{self.name}_count{_format_labels(base)} {state[-1]}")
+        return lines
+
+
+def render():
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Metrics of the app
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request.", ["route", "method", "status"])
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds", "Time spent in each stage of the request handlers.", ["stage"])
+UPSTREAM_CALLS = Counter(
+    "upstream_calls_total", "Calls to upstream services by outcome.", ["upstream", "outcome"])
+SOCIAL_CHECK_SECONDS = Histogram(
+    "social_check_duration_seconds", "Time to check one platform in check_social_media_presence.", ["platform"])
+SOCIAL_CHECKS = Counter(
+    "social_checks_total", "Platform checks in check_social_media_presence by result.", ["platform", "result"])
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "rate_limit_wait_seconds", "Time a call waited for its host's rate limiter.", ["host"])
+UPSTREAM_THROTTLED = Counter(
+    "upstream_throttled_total", "Throttling responses (see ratelimit.is_throttled) that slowed a host down.", ["host"])
+COALESCED_CALLS = Counter(
+    "coalesced_calls_total", "Lookups that joined an in-flight fetch of the same key.", ["platform"])
+JOBS = Counter(
+    "jobs_total", "Finished background jobs by type and status.", ["type", "status"])
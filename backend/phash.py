@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+
+HASH_SIZE = 8  # 8x8 low frequencies -> 64-bit hash
+HIGHFREQ_FACTOR = 4  # image is shrunk to 32x32 before the DCT
+
+
+def perceptual_hash(image):
+    """
+    Computes a 64-bit DCT perceptual hash (pHash) of an image.
+    Accepts a grayscale or BGR image as returned by OpenCV.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    size = HASH_SIZE * HIGHFREQ_FACTOR
+    small = cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(np.float32(small))
+    low_freq = dct[:HASH_SIZE, :HASH_SIZE].flatten()
+
+    # Each bit says whether that frequency is above the mean of the AC terms.
+    # The mean is used over the median because flat, symmetric images such as
+    # the default avatars have many near-zero coefficients sitting on the median.
+    bits = low_freq > low_freq[1:].mean()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hash_image_bytes(data):
+    """
+    Decodes an encoded image (JPEG, PNG, ...) in memory and returns its hash,
+    or None if the bytes could not be decoded.
+    """
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return None
+    return perceptual_hash(image)
+
+
+def hash_image_file(path):
+    """
+    Reads an image from disk and returns its hash, or None if it could not be read.
+    """
+    image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return None
+    return perceptual_hash(image)
+
+
+def hamming_distance(a, b):
+    """
+    Number of differing bits between two hashes.
+    """
+    return bin(a ^ b).count("1")
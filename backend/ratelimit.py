@@ -0,0 +1,203 @@
+import asyncio
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import metrics
+
+# Per-host token buckets for the upstream platforms. Every outbound call
+# takes a slot from its host's bucket before it is sent. Slots are handed
+# out in arrival order, so one burst of requests can't starve the others.
+# On a 429 the host's rate is halved and it pauses for a while; every
+# successful response moves the rate back up towards the configured one.
+# A 403 counts as throttling only from hosts that use it that way: many
+# sites answer 403 to any client they take for a bot, however slow.
+
+# Hosts matched by suffix: (requests per second, burst)
+HOST_LIMITS = {
+    "instagram.com": (0.5, 3),
+    "cdninstagram.com": (10, 20),
+    "fbcdn.net": (10, 20),
+    "google.com": (0.5, 2),
+    "x.com": (1, 3),
+    "nitter.privacydev.net": (1, 3),
+}
+DEFAULT_LIMIT = (5, 10)  # Any other host
+UNLIMITED_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+THROTTLE_STATUSES = (429,)
+FORBIDDEN_THROTTLE_HOSTS = ("instagram.com",)  # Hosts (by suffix) whose 403 also means throttling
+THROTTLE_PAUSE = 30  # seconds without requests after throttling
+MIN_RATE_FRACTION = 1 / 16  # Lowest rate after repeated throttling, relative to the configured one
+RECOVERY_STEP = 0.05  # Rate regained per successful response, relative to the configured one
+MAX_WAIT = 60  # seconds; calls that would wait longer fail with RateLimited
+
+_buckets = {}
+_lock = threading.Lock()
+
+
+class RateLimited(Exception):
+    """Raised when a host's queue is longer than the caller may wait."""
+
+
+class TokenBucket:
+    """
+    Token bucket kept as the time the next slot frees up, so a caller can
+    reserve its slot up front and then sleep (or await) until it is due.
+    """
+
+    def __init__(self, host, rate, burst):
+        self.host = host
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.throttled = 0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=MAX_WAIT):
+        """Takes the next free slot and returns the seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            interval = 1 / self.rate
+            next_slot = max(self._next_slot, now)
+            delay = max(0.0, next_slot - (self.burst - 1) * interval - now)
+            if max_wait is not None and delay > max_wait:
+                raise RateLimited(f"{self.host}: next request slot in {delay:.0f}s")
+            self._next_slot = next_slot + interval
+        metrics.RATE_LIMIT_WAIT_SECONDS.observe(delay, host=self.host)
+        return delay
+
+    def penalize(self, pause=THROTTLE_PAUSE):
+        """Halves the rate and holds back new requests for `pause` seconds."""
+        with self._lock:
+            self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.throttled += 1
+            # No burst after the pause, the next requests go out at the new rate
+            resume = time.monotonic() + pause + (self.burst - 1) / self.rate
+            self._next_slot = max(self._next_slot, resume)
+        metrics.UPSTREAM_THROTTLED.inc(host=self.host)
+        print(f"Throttled by {self.host}, slowing down to {self.rate:.2f} requests/s")
+
+    def reward(self):
+        if self.rate < self.base_rate:
+            with self._lock:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+
+    def stats(self):
+        return {
+            "rate": round(self.rate, 3),
+            "base_rate": self.base_rate,
+            "burst": self.burst,
+            "queued_seconds": round(max(0.0, self._next_slot - time.monotonic()), 1),
+            "throttled": self.throttled,
+        }
+
+
+def parse_limits(spec):
+    """Parses RATE_LIMITS, e.g. "instagram.com=0.2/2,google.com=1/3" (host=rate/burst)."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        host, _, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        limits[host.strip().lower()] = (float(rate), int(burst or 1))
+    return limits
+
+
+def host_of(url_or_host):
+    if "//" in url_or_host:
+        return (urlsplit(url_or_host).hostname or "").lower()
+    return url_or_host.lower()
+
+
+def bucket_for(url_or_host, identity=None):
+    """
+    Returns the bucket of a URL or host, or None for hosts that aren't limited.
+    Hosts matching the same HOST_LIMITS entry share its bucket. Calls made
+    as different identities (e.g. Instagram accounts) get a bucket each.
+    """
+    host = host_of(url_or_host)
+    if host in UNLIMITED_HOSTS:
+        return None
+    with _lock:
+        if not _buckets:
+            # Read on first use, after app.py has loaded .env
+            HOST_LIMITS.update(parse_limits(os.getenv("RATE_LIMITS", "")))
+        key = next((suffix for suffix in sorted(HOST_LIMITS, key=len, reverse=True)
+                    if host == suffix or host.endswith("." + suffix)), host)
+        rate, burst = HOST_LIMITS.get(key, DEFAULT_LIMIT)
+        if identity:
+            key = f"{key}@{identity}"
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(key, rate, burst)
+        return bucket
+
+
+def acquire(url_or_host, max_wait=MAX_WAIT, identity=None):
+    """Blocks until the host may be called. Raises RateLimited if that's more than max_wait away."""
+    bucket = bucket_for(url_or_host, identity)
+    if bucket is not None:
+        delay = bucket.reserve(max_wait)
+        if delay:
+            time.sleep(delay)
+
+
+async def acquire_async(url_or_host, max_wait=MAX_WAIT):
+    """acquire() for coroutines: waits without blocking the event loop."""
+    bucket = bucket_for(url_or_host)
+    if bucket is not None:
+        delay = bucket.reserve(max_wait)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def is_throttled(url_or_host, status):
+    if status in THROTTLE_STATUSES:
+        return True
+    host = host_of(url_or_host)
+    return status == 403 and any(host == suffix or host.endswith("." + suffix)
+                                 for suffix in FORBIDDEN_THROTTLE_HOSTS)
+
+
+def report_status(url_or_host, status, identity=None):
+    """
+    Feeds a response status back: throttling (see is_throttled) slows the
+    host down, successes speed it up again.
+    """
+    bucket = bucket_for(url_or_host, identity)
+    if bucket is None:
+        return
+    if is_throttled(url_or_host, status):
+        bucket.penalize()
+    elif status < 400:
+        bucket.reward()
+
+
+def stats():
+    with _lock:
+        return {key: bucket.stats() for key, bucket in _buckets.items()}
+
+
+def instaloader_rate_controller(context, identity=None, on_throttled=None):
+    """
+    rate_controller for instaloader.Instaloader: Instagram queries also go
+    through the instagram.com bucket (one per identity, e.g. the logged-in
+    account), and a 429 slows that bucket down for every caller.
+    on_throttled() is called on every 429.
+    """
+    import instaloader
+
+    class SharedRateController(instaloader.RateController):
+        def wait_before_query(self, query_type):
+            acquire("instagram.com", identity=identity)
+            super().wait_before_query(query_type)
+
+        def handle_429(self, query_type):
+            report_status("instagram.com", 429, identity=identity)
+            if on_throttled is not None:
+                on_throttled()
+            super().handle_429(query_type)
+
+    return SharedRateController(context)
@@ -1,8 +1,8 @@
 import instaloader
-import requests
 import numpy as np  
 import json
-import time
+import http_client
+import ratelimit
 
 # Constants
 API_URL = "http://127.0.0.1:5000/predict"  # URL of your Flask app
@@ -11,7 +11,7 @@ def extract_features_instaloader(username):  # Renamed function
     """
     Extracts features from an Instagram profile using Instaloader.
     """
-    loader = instaloader.Instaloader()
+    loader = instaloader.Instaloader(rate_controller=ratelimit.instaloader_rate_controller)
 
     try:
         profile = instaloader.Profile.from_username(loader.context, username)
@@ -52,12 +52,13 @@ def extract_features_instaloader(username):  # Renamed function
         print(f"Error: {e}")
         return None
 
-def send_to_model(features):  # Modified to send features
+def send_to_model(username):
     """
-    Sends the features to the Flask backend for prediction.
+    Sends the username to the Flask backend for prediction.
+    For many usernames use bulk_score.py.
     """
-    payload = {"features": features}
-    response = requests.post(API_URL, json=payload)
+    payload = {"username": username}  # /predict fetches the profile itself
+    response = http_client.post(API_URL, json=payload)
     return response.json()
 
 def display_profile_info(profile_info):
@@ -100,14 +101,11 @@ def main():
             # Display the feature vector
             display_features(features)
 
-            # Send features to the model for prediction
+            # Score the profile with the backend
             print("\n=== Prediction ===")
-            result = send_to_model(features)  # Send features to the API
+            result = send_to_model(username)  # Send the username to the API
             print(json.dumps(result, indent=4))  # Nicely format JSON output
 
-            # Add a delay to avoid rate limiting (adjust as needed)
-            time.sleep(2)
-
     except instaloader.exceptions.ProfileNotExistsException:
         print("Error: Profile does not exist.")
     except Exception as e:
@@ -0,0 +1,156 @@
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import ratelimit
+
+# Pool of logged-in Instaloader sessions, one per Instagram account.
+# Each lookup checks out the least busy healthy session; a session that
+# gets throttled or logged out cools down (longer on every strike) while
+# the others take its traffic. If all of them are cooling down, the one
+# that recovers first is used, as the single session was before.
+# Every account has its own rate limiter bucket, so throughput grows with
+# the number of accounts.
+
+COOLDOWN_BASE = 60  # seconds after the first strike, doubled on every further one
+COOLDOWN_MAX = 3600  # seconds
+
+
+class PooledSession:
+    def __init__(self, name, loader=None):
+        self.name = name
+        self.loader = loader
+        self.in_use = 0
+        self.requests = 0
+        self.strikes = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.last_error = None
+
+    def healthy(self, now):
+        return now >= self.cooldown_until
+
+    def status(self):
+        return {
+            "name": self.name,
+            "in_use": self.in_use,
+            "requests": self.requests,
+            "failures": self.failures,
+            "cooldown_seconds": round(max(0.0, self.cooldown_until - time.monotonic()), 1),
+            "last_error": self.last_error,
+        }
+
+
+def is_session_error(error):
+    """
+    True for errors that point at the session (throttled, logged out,
+    checkpoint) rather than at the looked up profile.
+    """
+    import instaloader
+
+    if isinstance(error, (instaloader.exceptions.ProfileNotExistsException,
+                          instaloader.exceptions.QueryReturnedNotFoundException)):
+        return False
+    return isinstance(error, (instaloader.exceptions.ConnectionException,
+                              instaloader.exceptions.LoginRequiredException,
+                              ratelimit.RateLimited))
+
+
+class SessionPool:
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self):
+        """Yields the Instaloader of the least busy healthy session."""
+        session = self._acquire()
+        try:
+            yield session.loader
+        except Exception as e:
+            if is_session_error(e):
+                self.mark_unhealthy(session, e)
+            raise
+        else:
+            session.strikes = 0
+        finally:
+            with self._lock:
+                session.in_use -= 1
+
+    def _acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            healthy = [session for session in self.sessions if session.healthy(now)]
+            if healthy:
+                session = min(healthy, key=lambda s: (s.in_use, s.requests))
+            else:
+                session = min(self.sessions, key=lambda s: s.cooldown_until)
+            session.in_use += 1
+            session.requests += 1
+            return session
+
+    def mark_unhealthy(self, session, error=None):
+        """Puts a session into cooldown, longer on every strike in a row."""
+        with self._lock:
+            cooldown = min(COOLDOWN_MAX, COOLDOWN_BASE * 2 ** session.strikes)
+            session.strikes += 1
+            session.failures += 1
+            session.cooldown_until = max(session.cooldown_until, time.monotonic() + cooldown)
+            session.last_error = str(error) if error else "throttled"
+        print(f"Instagram session {session.name} cooling down for {cooldown}s: {session.last_error}")
+
+    def status(self):
+        return [session.status() for session in self.sessions]
+
+
+def parse_session_files(spec):
+    """Parses INSTAGRAM_SESSIONS, e.g. "alice:sessions/alice,bob:sessions/bob" (username:session file)."""
+    accounts = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        username, _, path = item.partition(":")
+        accounts.append((username.strip(), path.strip()))
+    return accounts
+
+
+def load_pool(accounts, login=None):
+    """
+    Builds a pool with one Instaloader per (username, session file).
+    Accounts whose session can't be loaded are skipped; login(loader, username, path)
+    is tried first for a missing file when given. With no usable account the pool
+    holds a single anonymous session.
+    """
+    import instaloader
+
+    pool = SessionPool([])
+
+    def new_loader(session):
+        return instaloader.Instaloader(rate_controller=functools.partial(
+            ratelimit.instaloader_rate_controller, identity=session.name,
+            on_throttled=functools.partial(pool.mark_unhealthy, session)))
+
+    for username, path in accounts:
+        session = PooledSession(username)
+        loader = new_loader(session)
+        try:
+            if os.path.exists(path):
+                loader.load_session_from_file(username, path)
+                print(f"Loaded Instagram session {username} from {path}.")
+            elif login is not None:
+                login(loader, username, path)
+            else:
+                print(f"Skipping Instagram session {username}: {path} not found.")
+                continue
+        except Exception as e:
+            print(f"Error loading Instagram session {username}: {e}")
+            continue
+        session.loader = loader
+        pool.sessions.append(session)
+
+    if not pool.sessions:
+        print("No Instagram session loaded, using an anonymous one.")
+        session = PooledSession("anonymous")
+        session.loader = new_loader(session)
+        pool.sessions.append(session)
+    return pool
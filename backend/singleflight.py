@@ -0,0 +1,55 @@
+import threading
+
+import metrics
+
+# Request coalescing: while a fetch for a key is in flight, other callers
+# asking for the same key wait for it and share its result (or its error)
+# instead of starting a fetch of their own.
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, load):
+        """
+        Returns load(), or the result of the call for key already in flight.
+        Keys are tuples starting with the platform, e.g. ("instagram", username).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.COALESCED_CALLS.inc(platform=key[0])
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = load()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,128 @@
+import math
+import operator
+import re
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# Heuristic fake-probability score for scraped Twitter profiles, as a rule
+# table. Each profile is reduced to one row of features; the rules then run
+# over whole feature columns with NumPy, so a batch is scored in one pass.
+#
+# The scores are exactly those of the original per-profile if-chain,
+# including its quirks: a profile the rules can't be applied to (missing
+# keys, no description, counts that are None, ...) scores ERROR_PROBABILITY,
+# and created_at has no year, so it parses as 1900.
+
+CREATED_AT_FORMAT = "%a %b %d %H:%M"  # As written by extract_features_twitter()
+SUSPICIOUS_KEYWORDS = ["bot", "promo", "cheap", "follow", "like"]
+SUSPICIOUS_PATTERN = re.compile("|".join(map(re.escape, SUSPICIOUS_KEYWORDS)))
+MAX_SCORE = 20  # probability = score / MAX_SCORE, capped at 1
+ERROR_PROBABILITY = 0.5  # Neutral probability for profiles that can't be scored
+
+# (feature, tiers): the first tier whose test passes adds its points.
+# Features that don't apply to a profile are NaN and add nothing.
+RULES = [
+    ("account_age_days", [("<", 30, 3), ("<", 90, 1)]),
+    ("followers_count", [("<", 10, 3), ("<", 100, 1)]),
+    ("friends_count", [(">", 1000, 2), (">", 500, 1)]),
+    ("statuses_count", [("<", 10, 3), ("<", 50, 1)]),
+    ("default_profile_image", [("==", True, 2)]),
+    ("description_length", [("<", 10, 2)]),
+    ("followers_per_friend", [("<", 0.1, 2)]),
+    ("suspicious_screen_name", [("==", True, 2)]),
+    ("suspicious_description", [("==", True, 1)]),
+]
+
+OPS = {"<": operator.lt, ">": operator.gt, "==": operator.eq}
+
+# Values that go into a float64 column unchanged for every rule above
+MAX_EXACT_INT = 2 ** 1000
+
+
+@lru_cache(maxsize=4096)
+def parse_created_at(created_at):
+    return datetime.strptime(created_at, CREATED_AT_FORMAT)
+
+
+def has_suspicious_keyword(text):
+    return SUSPICIOUS_PATTERN.search(text.lower()) is not None
+
+
+def profile_features(profile_info, now):
+    """
+    Returns the feature row of a profile, in RULES order. Raises for
+    profiles the rules can't be applied to.
+    """
+    created_at = profile_info['created_at']
+    followers = profile_info['followers_count']
+    friends = profile_info['friends_count']
+    description = profile_info['description']
+    return (
+        (now - parse_created_at(created_at)).days if created_at is not None else math.nan,
+        followers,
+        friends,
+        profile_info['statuses_count'],
+        bool(profile_info['default_profile_image']),
+        len(description),
+        followers / friends if followers and friends else math.nan,
+        has_suspicious_keyword(profile_info['screen_name']),
+        has_suspicious_keyword(description),
+    )
+
+
+def score_row(values):
+    """Applies the rules to one feature row with Python operators (may raise, e.g. for None counts)."""
+    score = 0
+    for value, (_, tiers) in zip(values, RULES):
+        for op, threshold, points in tiers:
+            if OPS[op](value, threshold):
+                score += points
+                break
+    return min(score / MAX_SCORE, 1)
+
+
+def is_plain_number(value):
+    return type(value) is float or (type(value) in (int, bool) and -MAX_EXACT_INT < value < MAX_EXACT_INT)
+
+
+def fake_probability(profile_info):
+    """Fake probability of a single profile."""
+    try:
+        return score_row(profile_features(profile_info, datetime.now()))
+    except Exception as e:
+        print(f"Error calculating fake probability: {e}")
+        return ERROR_PROBABILITY
+
+
+def fake_probabilities(profiles):
+    """
+    Fake probabilities of a list of profiles, equal to fake_probability()
+    of each. Rows holding anything other than plain numbers (None counts,
+    strings, ...) are scored one by one, to keep Python's semantics for them.
+    """
+    now = datetime.now()
+    probabilities = np.full(len(profiles), ERROR_PROBABILITY)
+    rows, row_index = [], []
+    for i, profile_info in enumerate(profiles):
+        try:
+            values = profile_features(profile_info, now)
+            # The other features are ints, bools or floats already
+            if is_plain_number(values[1]) and is_plain_number(values[2]) and is_plain_number(values[3]):
+                rows.append(values)
+                row_index.append(i)
+            else:
+                probabilities[i] = score_row(values)
+        except Exception as e:
+            print(f"Error calculating fake probability: {e}")
+
+    if rows:
+        columns = np.array(rows, dtype=np.float64).T
+        scores = np.zeros(len(rows), dtype=np.int64)
+        for column, (_, tiers) in zip(columns, RULES):
+            conditions = [OPS[op](column, threshold) for op, threshold, _ in tiers]
+            scores += np.select(conditions, [points for _, _, points in tiers], 0)
+        probabilities[row_index] = np.minimum(scores / MAX_SCORE, 1)
+
+    return probabilities.tolist()